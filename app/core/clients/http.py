@@ -1,8 +1,11 @@
+from concurrent.futures import Future
 from dataclasses import dataclass, field
+from threading import Lock, local
 from typing import Any, Dict, List, Protocol
 
 from fastapi import HTTPException
-from requests import get
+from requests import Session, get
+from requests.adapters import HTTPAdapter
 
 
 class IHTTPClient(Protocol):
@@ -24,9 +27,114 @@ class RequestsClient(IHTTPClient):
         return response.json()  # type: ignore
 
 
+@dataclass(frozen=True)
+class PoolStats:
+    host: str
+    connections_opened: int
+    requests_sent: int
+    idle_connections: int
+
+
+@dataclass
+class PooledRequestsClient(IHTTPClient):
+    connect_timeout_s: float = 2
+    read_timeout_s: float = 5
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    headers: dict[str, str] = field(default_factory=dict)
+    _adapter: HTTPAdapter = field(init=False)
+    _sessions: local = field(init=False, default_factory=local)
+
+    def __post_init__(self) -> None:
+        # urllib3 pools are thread-safe, sessions are not: one session per
+        # worker thread, all of them sharing the same keep-alive pools
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+        )
+
+    def get(self, url: str) -> Dict[str, Any] | List[Any]:
+        response = self._session().get(
+            url, timeout=(self.connect_timeout_s, self.read_timeout_s)
+        )
+        try:
+            response.raise_for_status()
+        except Exception:
+            raise HTTPException(status_code=500, detail="Service Unavailable")
+        return response.json()  # type: ignore
+
+    def pool_stats(self) -> List[PoolStats]:
+        pools = self._adapter.poolmanager.pools
+        stats: List[PoolStats] = []
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats.append(
+                PoolStats(
+                    host=pool.host,
+                    connections_opened=pool.num_connections,
+                    requests_sent=pool.num_requests,
+                    idle_connections=pool.pool.qsize() if pool.pool else 0,
+                )
+            )
+        return stats
+
+    def close(self) -> None:
+        self._adapter.close()
+
+    def _session(self) -> Session:
+        session: Session | None = getattr(self._sessions, "session", None)
+        if session is None:
+            session = Session()
+            session.headers.update(self.headers)
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._sessions.session = session
+        return session
+
+
+@dataclass
+class SingleFlightClient(IHTTPClient):
+    http_client: IHTTPClient
+    coalesced: int = field(init=False, default=0)
+    _in_flight: Dict[str, Future[Dict[str, Any] | List[Any]]] = field(
+        init=False, default_factory=dict
+    )
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def get(self, url: str) -> Dict[str, Any] | List[Any]:
+        with self._lock:
+            call = self._in_flight.get(url)
+            leader = call is None
+            if call is None:
+                call = self._in_flight[url] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # another caller already requested this url, share its outcome
+            return call.result()
+
+        try:
+            call.set_result(self.http_client.get(url))
+        except BaseException as error:
+            call.set_exception(error)
+        finally:
+            with self._lock:
+                del self._in_flight[url]
+        return call.result()
+
+
+def default_http_client() -> IHTTPClient:
+    return SingleFlightClient(PooledRequestsClient())
+
+
 @dataclass
 class RequestsClientBuilder:
     _timeout_s: int = field(init=False, default=5)
+    _connect_timeout_s: float = field(init=False, default=2)
+    _pool_connections: int = field(init=False, default=10)
+    _pool_maxsize: int = field(init=False, default=10)
     _headers: dict[str, str] = field(init=False, default_factory=dict)
 
     def with_timeout(self, seconds: int) -> "RequestsClientBuilder":
@@ -34,6 +142,19 @@ class RequestsClientBuilder:
 
         return self
 
+    def with_connect_timeout(self, seconds: float) -> "RequestsClientBuilder":
+        self._connect_timeout_s = seconds
+
+        return self
+
+    def with_pool_size(
+        self, hosts: int, connections_per_host: int
+    ) -> "RequestsClientBuilder":
+        self._pool_connections = hosts
+        self._pool_maxsize = connections_per_host
+
+        return self
+
     def with_header(self, name: str, value: str) -> "RequestsClientBuilder":
         self._headers[name] = value
 
@@ -41,3 +162,12 @@ class RequestsClientBuilder:
 
     def build(self) -> RequestsClient:
         return RequestsClient(self._timeout_s, self._headers)
+
+    def build_pooled(self) -> PooledRequestsClient:
+        return PooledRequestsClient(
+            connect_timeout_s=self._connect_timeout_s,
+            read_timeout_s=self._timeout_s,
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            headers=self._headers,
+        )
@@ -3,4 +3,25 @@ KEY_FOR_ADDRESS_GEN: str = "DrIFIlcThhR82AyB"
 ADMIN_KEY = "tbeqvuluci"
 INITIAL_BALANCE = 100000000
 WALLET_LIMIT_PER_USER = 3
-COMMISSION_PERCENT = 1.5
+WALLET_CACHE_SIZE = 100000
+WALLET_CACHE_PRELOAD = 10000
+TRANSACTIONS_PAGE_SIZE = 50
+TRANSACTIONS_MAX_PAGE_SIZE = 500
+TRANSACTIONS_EXPORT_BATCH_SIZE = 1000
+STATISTICS_DEFAULT_BUCKETS = 24
+# a year of hourly buckets
+STATISTICS_MAX_BUCKETS = 366 * 24
+COMMISSION_BASIS_POINTS = 150
+COMMISSION_PERCENT = COMMISSION_BASIS_POINTS / 100
+RATE_CACHE_TTL_S = 30
+RATE_POLL_INTERVAL_S = 10
+RATE_MAX_STALENESS_S = 6 * 60 * 60
+RATE_DEGRADED_AFTER_S = 60
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT_S = 30
+HEALTH_CHECK_INTERVAL_S = 15
+RATE_HEDGE_DELAY_S = 0.3
+ROUTING_EWMA_ALPHA = 0.2
+ROUTING_PROBE_RATIO = 0.05
+ROUTING_ERROR_PENALTY_S = 5.0
+RATE_MATRIX_TTL_S = 30
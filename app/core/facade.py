@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from hashlib import sha256
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 
 from app.core.constants.constants import ADMIN_KEY, INITIAL_BALANCE, KEY_FOR_ADDRESS_GEN
 from app.core.interactors.authentication import (
@@ -8,6 +9,7 @@ from app.core.interactors.authentication import (
     IAuthenticateInteractor,
 )
 from app.core.interactors.commission import CommissionCalculator, ICommissionCalculator
+from app.core.interactors.conversion import IRateFreshness, IRateService
 from app.core.interactors.transactions import (
     ITransactionsInteractor,
     ITransactionsRepository,
@@ -19,17 +21,30 @@ from app.core.interactors.users import (
     UserInteractor,
 )
 from app.core.interactors.wallets import (
+    HTTPConverter,
     IWalletsInteractor,
     IWalletsRepository,
     WalletsInteractor,
 )
+from app.core.models.req.statistics import StatisticsBucket
 from app.core.models.req.transaction import TransactionRequest
 from app.core.models.req.user import CreateUserRequest
 from app.core.models.resp.core_response import CoreResponse, CoreStatus
-from app.core.models.resp.statistics import BadStatisticsResponse, StatisticsResponse
-from app.core.models.resp.transaction import GetTransactionsResponse
+from app.core.models.resp.statistics import (
+    BadStatisticsResponse,
+    StatisticsRangeResponse,
+    StatisticsResponse,
+)
+from app.core.models.resp.transaction import (
+    GetTransactionsResponse,
+    TransactionResponse,
+)
 from app.core.models.resp.user import CreateUserResponse
-from app.core.models.resp.wallet import BadWalletResponse, WalletResponse
+from app.core.models.resp.wallet import (
+    BadWalletResponse,
+    GetWalletsResponse,
+    WalletResponse,
+)
 
 
 def sha_256_using_hardcoded_key(user_id: int, wallet_address: int) -> str:
@@ -57,23 +72,21 @@ class BitcoinWalletCore:
     def make_transaction(
         self, api_key: Optional[str], req: TransactionRequest
     ) -> CoreResponse[None]:
-        # check if api key is valid
-        user_id_response = self.user_interactor.get_user_id(api_key)
-        if user_id_response.status != CoreStatus.SUCCESSFUL_GET:
+        # resolve api key and owned wallets once for the whole request
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
             return self._create_bad_none_response(
-                user_id_response.status, user_id_response.message
+                principal_response.status, principal_response.message
             )
-
-        # get wallet_ids for addresses
-        from_id_response = self.wallet_interactor.get_wallet_id(req.from_address)
+        principal = principal_response.response_content
 
         # check address belongs to user
-        check_ownership_response = self.wallet_interactor.check_wallet_belongs_to_user(
-            from_id_response.response_content, user_id_response.response_content
+        from_id_response = self.wallet_interactor.check_principal_owns(
+            principal, req.from_address
         )
-        if check_ownership_response.status == CoreStatus.WALLET_DOESNT_BELONG_TO_USER:
+        if from_id_response.status == CoreStatus.WALLET_DOESNT_BELONG_TO_USER:
             return self._create_bad_none_response(
-                check_ownership_response.status, check_ownership_response.message
+                from_id_response.status, from_id_response.message
             )
 
         # check sending wallet exist
@@ -85,131 +98,163 @@ class BitcoinWalletCore:
 
         # calculate commission
         commission = self.commission_calculator.get_commission(
-            user_id_response.response_content,
+            principal,
             from_id_response.response_content,
             to_id_response.response_content,
             req.amount_in_satoshi,
         )
 
-        # check wallet has enough balance
-        balance = self.wallet_interactor.get_wallet_balance(
-            req.from_address
-        ).response_content.satoshi_balance
-        if balance < req.amount_in_satoshi + commission:
-            return self._create_bad_none_response(
-                CoreStatus.INSUFFICIENT_FUNDS, "insufficient funds"
-            )
-
-        # update balance if transaction successful
-        transaction_response = self.transactions_interactor.create(
+        # debit, credit and ledger entry in one atomic step
+        return self.transactions_interactor.transfer(
             from_id_response.response_content,
             to_id_response.response_content,
             req.amount_in_satoshi,
             commission,
         )
-        if transaction_response.status != CoreStatus.SUCCESSFUL_POST:
-            return transaction_response
-
-        self.wallet_interactor.update_balance(
-            req.from_address, balance - (req.amount_in_satoshi + commission)
-        )
-        receiver_balance = balance = self.wallet_interactor.get_wallet_balance(
-            req.to_address
-        ).response_content.satoshi_balance
-        self.wallet_interactor.update_balance(
-            req.to_address, receiver_balance + req.amount_in_satoshi
-        )
-        transaction_response.message = "Transaction completed successfully"
-        return transaction_response
 
     def get_transactions(
-        self, api_key: Optional[str]
+        self,
+        api_key: Optional[str],
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> CoreResponse[GetTransactionsResponse]:
-        # check if api key is valid
-        user_id_response = self.user_interactor.get_user_id(api_key)
-        if user_id_response.status != CoreStatus.SUCCESSFUL_GET:
+        # check if api key is valid, owned wallets come with it
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
             return self._create_bad_transactions_response(
-                user_id_response.status, user_id_response.message
+                principal_response.status, principal_response.message
             )
 
-        # get wallet_ids for user (always: SUCCESSFUL_GET)
-        wallet_ids_response = self.wallet_interactor.get_user_wallets(
-            user_id_response.response_content
-        )
-
         # get transactions for wallet_ids
-        return self.transactions_interactor.get(wallet_ids_response.response_content)
+        return self.transactions_interactor.get(
+            principal_response.response_content.wallet_ids(), limit, cursor
+        )
 
     def get_transactions_for_wallet(
-        self, api_key: Optional[str], address: str
+        self,
+        api_key: Optional[str],
+        address: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> CoreResponse[GetTransactionsResponse]:
         # check if api key is valid
-        user_id_response = self.user_interactor.get_user_id(api_key)
-        if user_id_response.status != CoreStatus.SUCCESSFUL_GET:
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
             return self._create_bad_transactions_response(
-                user_id_response.status, user_id_response.message
+                principal_response.status, principal_response.message
             )
 
-        # get wallet_id for address
-        wallet_id_response = self.wallet_interactor.get_wallet_id(address)
+        # check if address is owned by the user
+        wallet_id_response = self.wallet_interactor.check_principal_owns(
+            principal_response.response_content, address
+        )
         if wallet_id_response.status != CoreStatus.SUCCESSFUL_GET:
+            # unknown addresses are reported as such, not as foreign wallets
+            unknown_response = self.wallet_interactor.get_wallet_id(address)
+            if unknown_response.status != CoreStatus.SUCCESSFUL_GET:
+                wallet_id_response = unknown_response
             return self._create_bad_transactions_response(
                 wallet_id_response.status, wallet_id_response.message
             )
 
-        # check if address is owned by the user
-        check_ownership_response = self.wallet_interactor.check_wallet_belongs_to_user(
-            wallet_id_response.response_content, user_id_response.response_content
+        # get transactions for wallet_id
+        return self.transactions_interactor.get(
+            [wallet_id_response.response_content], limit, cursor
         )
-        if not check_ownership_response.response_content:
-            return self._create_bad_transactions_response(
-                check_ownership_response.status, check_ownership_response.message
+
+    def stream_transactions(
+        self, api_key: Optional[str]
+    ) -> CoreResponse[Iterator[TransactionResponse]]:
+        # authentication happens here, before the first byte is streamed
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
+            return CoreResponse(
+                iter([]), principal_response.status, principal_response.message
             )
 
-        # get transactions for wallet_id
-        return self.transactions_interactor.get([wallet_id_response.response_content])
+        return self.transactions_interactor.stream(
+            principal_response.response_content.wallet_ids()
+        )
+
+    def stream_transactions_for_wallet(
+        self, api_key: Optional[str], address: str
+    ) -> CoreResponse[Iterator[TransactionResponse]]:
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
+            return CoreResponse(
+                iter([]), principal_response.status, principal_response.message
+            )
+
+        wallet_id_response = self.wallet_interactor.check_principal_owns(
+            principal_response.response_content, address
+        )
+        if wallet_id_response.status != CoreStatus.SUCCESSFUL_GET:
+            unknown_response = self.wallet_interactor.get_wallet_id(address)
+            if unknown_response.status != CoreStatus.SUCCESSFUL_GET:
+                wallet_id_response = unknown_response
+            return CoreResponse(
+                iter([]), wallet_id_response.status, wallet_id_response.message
+            )
+
+        return self.transactions_interactor.stream(
+            [wallet_id_response.response_content]
+        )
 
-    def create_wallet(self, api_key: str | None) -> CoreResponse[WalletResponse]:
-        user_id_response = self.user_interactor.get_user_id(api_key)
-        if user_id_response.status != CoreStatus.SUCCESSFUL_GET:
+    def create_wallet(
+        self, api_key: str | None, include_usd: bool = True
+    ) -> CoreResponse[WalletResponse]:
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
             return self._create_bad_wallet_response(
-                user_id_response.status, user_id_response.message
+                principal_response.status, principal_response.message
             )
 
-        wallets = self.wallet_interactor.get_user_wallets(
-            user_id_response.response_content
-        ).response_content
+        principal = principal_response.response_content
         address = self.address_generation_strategy(
-            user_id_response.response_content, len(wallets)
+            principal.user_id, len(principal.wallets)
         )
         # create wallet
         return self.wallet_interactor.create_wallet(
-            user_id_response.response_content,
+            principal.user_id,
             address,
             INITIAL_BALANCE,
+            include_usd,
         )
 
     def get_wallet_balance(
-        self, api_key: Optional[str], address: str
+        self, api_key: Optional[str], address: str, include_usd: bool = True
     ) -> CoreResponse[WalletResponse]:
         # check if api key is valid
-        user_id_response = self.user_interactor.get_user_id(api_key)
-        if user_id_response.status != CoreStatus.SUCCESSFUL_GET:
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
             return self._create_bad_wallet_response(
-                user_id_response.status, user_id_response.message
+                principal_response.status, principal_response.message
             )
-        # get wallet_ids for addresses
-        wallet_id_response = self.wallet_interactor.get_wallet_id(address)
 
         # check address belongs to user
-        check_ownership_response = self.wallet_interactor.check_wallet_belongs_to_user(
-            wallet_id_response.response_content, user_id_response.response_content
+        check_ownership_response = self.wallet_interactor.check_principal_owns(
+            principal_response.response_content, address
         )
         if check_ownership_response.status == CoreStatus.WALLET_DOESNT_BELONG_TO_USER:
             return self._create_bad_wallet_response(
                 check_ownership_response.status, check_ownership_response.message
             )
-        return self.wallet_interactor.get_wallet_balance(address)
+        return self.wallet_interactor.get_wallet_balance(address, include_usd)
+
+    def get_wallets(
+        self, api_key: Optional[str], include_usd: bool = True
+    ) -> CoreResponse[GetWalletsResponse]:
+        principal_response = self.user_interactor.get_principal(api_key)
+        if principal_response.status != CoreStatus.SUCCESSFUL_GET:
+            return CoreResponse(
+                response_content=GetWalletsResponse([]),
+                status=principal_response.status,
+                message=principal_response.message,
+            )
+
+        return self.wallet_interactor.get_user_wallet_balances(
+            principal_response.response_content.user_id, include_usd
+        )
 
     def get_statistics(
         self, admin_key: Optional[str]
@@ -220,22 +265,44 @@ class BitcoinWalletCore:
             )
         return self.transactions_interactor.get_statistics()
 
+    def get_statistics_range(
+        self,
+        admin_key: Optional[str],
+        bucket: StatisticsBucket,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> CoreResponse[StatisticsRangeResponse]:
+        if not self.authenticate_interactor.authenticate(admin_key):
+            return CoreResponse(
+                StatisticsRangeResponse(bucket.value, []),
+                CoreStatus.INVALID_ADMIN_KEY,
+                "invalid admin key",
+            )
+        return self.transactions_interactor.get_statistics_range(bucket, start, end)
+
     @classmethod
     def create(
         cls,
         transactions_repository: ITransactionsRepository,
         users_repository: IUsersRepository,
         wallets_repository: IWalletsRepository,
+        rate_service: Optional[IRateService] = None,
+        rate_freshness: Optional[IRateFreshness] = None,
     ) -> "BitcoinWalletCore":
+        converter = (
+            HTTPConverter(freshness=rate_freshness)
+            if rate_service is None
+            else HTTPConverter(rate_service, freshness=rate_freshness)
+        )
         return cls(
             transactions_interactor=TransactionsInteractor(
                 transaction_repository=transactions_repository
             ),
             user_interactor=UserInteractor(user_repository=users_repository),
-            wallet_interactor=WalletsInteractor(wallet_repository=wallets_repository),
-            commission_calculator=CommissionCalculator(
-                wallet_repository=wallets_repository
+            wallet_interactor=WalletsInteractor(
+                wallet_repository=wallets_repository, converter=converter
             ),
+            commission_calculator=CommissionCalculator(),
             authenticate_interactor=AuthenticateInteractor(
                 authentication_key=ADMIN_KEY
             ),
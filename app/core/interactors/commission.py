@@ -1,26 +1,25 @@
 from dataclasses import dataclass
-from math import ceil
 from typing import Protocol
 
-from app.core.constants.constants import COMMISSION_PERCENT
-from app.core.interactors.wallets import IWalletsRepository
+from app.core.constants.constants import COMMISSION_BASIS_POINTS
+from app.core.interactors.users import Principal
+from app.core.money import fee
 
 
 class ICommissionCalculator(Protocol):
     def get_commission(
-        self, user_id: int, from_id: int, to_id: int, amount: int
+        self, principal: Principal, from_id: int, to_id: int, amount: int
     ) -> int:
         pass
 
 
 @dataclass
 class CommissionCalculator:
-    wallet_repository: IWalletsRepository
+    basis_points: int = COMMISSION_BASIS_POINTS
 
     def get_commission(
-        self, user_id: int, from_id: int, to_id: int, amount: int
+        self, principal: Principal, from_id: int, to_id: int, amount: int
     ) -> int:
-        wallet_ids = self.wallet_repository.get_user_wallets(user_id)
-        if from_id in wallet_ids and to_id in wallet_ids:
+        if principal.owns(from_id) and principal.owns(to_id):
             return 0
-        return int(ceil(amount * COMMISSION_PERCENT / 100))
+        return fee(amount, self.basis_points)
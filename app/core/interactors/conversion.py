@@ -1,17 +1,26 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from decimal import Decimal
 from enum import Enum, auto
+from threading import Lock, Thread
+from time import monotonic
 from types import MappingProxyType
-from typing import Any, Callable, Dict, List, Protocol
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple
 
 from fastapi import HTTPException
 
-from app.core.clients.http import IHTTPClient, RequestsClient
+from app.core.clients.http import IHTTPClient, default_http_client
+from app.core.constants.constants import RATE_CACHE_TTL_S
+from app.core.interactors.health import CircuitBreaker
+from app.core.interactors.routing import LatencyRouter
 
 
 class Currency(Enum):
     BITCOIN = auto()
     USD = auto()
+    EUR = auto()
+    GBP = auto()
+    JPY = auto()
 
 
 class IRateService(Protocol):
@@ -19,7 +28,14 @@ class IRateService(Protocol):
         pass
 
 
+class IRateFreshness(Protocol):
+    def is_degraded(self) -> bool:
+        pass
+
+
 class IHTTPRateService(Protocol):
+    name: str
+
     def ping(self) -> bool:
         pass
 
@@ -27,6 +43,13 @@ class IHTTPRateService(Protocol):
         pass
 
 
+class IProviderRateService(Protocol):
+    def get_rate_with_provider(
+        self, from_currency: Currency, to_currency: Currency
+    ) -> Tuple[Decimal, str]:
+        pass
+
+
 @dataclass
 class HTTPRateService(IHTTPRateService):
     rate_base_url: str
@@ -36,6 +59,7 @@ class HTTPRateService(IHTTPRateService):
     rate_url_formatting_strategy: Callable[[str, str, str], str]
     rate_response_parsing_strategy: Callable[[Dict[str, Any] | List[Any]], Decimal]
     status_response_parsing_strategy: Callable[[Dict[str, Any] | List[Any]], bool]
+    name: str
 
     def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
         url = self.rate_url_formatting_strategy(
@@ -51,7 +75,17 @@ class HTTPRateService(IHTTPRateService):
         return self.status_response_parsing_strategy(response)
 
 
-bitfinex_mapper = MappingProxyType({Currency.BITCOIN: "BTC", Currency.USD: "USD"})
+BITFINEX_RATE_URL = "https://api.bitfinex.com/v2/ticker/t"
+BITFINEX_STATUS_URL = "https://api-pub.bitfinex.com/v2/platform/status"
+bitfinex_mapper = MappingProxyType(
+    {
+        Currency.BITCOIN: "BTC",
+        Currency.USD: "USD",
+        Currency.EUR: "EUR",
+        Currency.GBP: "GBP",
+        Currency.JPY: "JPY",
+    }
+)
 
 
 def bitfinex_rate_response_parser(response: Dict[str, Any] | List[Any]) -> Decimal:
@@ -69,13 +103,10 @@ def bitfinex_status_parser(response: Dict[str, Any] | List[Any]) -> bool:
 
 @dataclass
 class BitFinexRateService(HTTPRateService):
-    rate_base_url: str = field(
-        init=False, default="https://api.bitfinex.com/v2/ticker/t"
-    )
-    status_url: str = field(
-        init=False, default="https://api-pub.bitfinex.com/v2/platform/status"
-    )
-    http_client: IHTTPClient = field(default_factory=RequestsClient)
+    name: str = field(init=False, default="bitfinex")
+    rate_base_url: str = field(init=False, default=BITFINEX_RATE_URL)
+    status_url: str = field(init=False, default=BITFINEX_STATUS_URL)
+    http_client: IHTTPClient = field(default_factory=default_http_client)
     currency_mapper: MappingProxyType[Currency, str] = bitfinex_mapper
     rate_url_formatting_strategy: Callable[[str, str, str], str] = appender
 
@@ -87,11 +118,23 @@ class BitFinexRateService(HTTPRateService):
     ] = bitfinex_status_parser
 
 
-kraken_mapper = MappingProxyType({Currency.BITCOIN: "btc", Currency.USD: "usd"})
+KRAKEN_RATE_URL = "https://api.kraken.com/0/public/Ticker?pair="
+KRAKEN_STATUS_URL = "https://api.kraken.com/0/public/SystemStatus"
+kraken_mapper = MappingProxyType(
+    {
+        Currency.BITCOIN: "XBT",
+        Currency.USD: "USD",
+        Currency.EUR: "EUR",
+        Currency.GBP: "GBP",
+        Currency.JPY: "JPY",
+    }
+)
 
 
 def kraken_rate_response_parser(response: Dict[str, Any] | List[Any]) -> Decimal:
-    return Decimal(response["result"]["XXBTZUSD"][0][0])  # type: ignore
+    # {"result": {"XXBTZUSD": {"c": [last trade price, lot volume], ...}}}
+    ticker = next(iter(response["result"].values()))  # type: ignore
+    return Decimal(ticker["c"][0])
 
 
 def kraken_status_parser(response: Dict[str, Any] | List[Any]) -> bool:
@@ -100,32 +143,224 @@ def kraken_status_parser(response: Dict[str, Any] | List[Any]) -> bool:
 
 @dataclass
 class KrakenFinexRateService(HTTPRateService):
-    rate_base_url: str = field(
-        init=False, default="https://api.bitfinex.com/v2/ticker/t"
-    )
-    status_url: str = field(
-        init=False, default="https://api.kraken.com/0/public/SystemStatus"
-    )
-    http_client: IHTTPClient = field(default_factory=RequestsClient)
+    name: str = field(init=False, default="kraken")
+    rate_base_url: str = field(init=False, default=KRAKEN_RATE_URL)
+    status_url: str = field(init=False, default=KRAKEN_STATUS_URL)
+    http_client: IHTTPClient = field(default_factory=default_http_client)
     currency_mapper: MappingProxyType[Currency, str] = field(
         init=False, default=kraken_mapper
     )
-    rate_url_formatting_strategy: Callable[[str, str, str], str] = field(
-        init=False, default=appender
-    )
+    # plain defaults: an init=False function default would bind as a method
+    rate_url_formatting_strategy: Callable[[str, str, str], str] = appender
     rate_response_parsing_strategy: Callable[
         [Dict[str, Any] | List[Any]], Decimal
-    ] = field(init=False, default=kraken_rate_response_parser)
+    ] = kraken_rate_response_parser
     status_response_parsing_strategy: Callable[
         [Dict[str, Any] | List[Any]], bool
-    ] = field(init=False, default=kraken_status_parser)
+    ] = kraken_status_parser
+
+
+def default_rate_services() -> List[IHTTPRateService]:
+    return [BitFinexRateService(), KrakenFinexRateService()]
 
 
-class SubstitutableHTTPRateService(IRateService):
-    services: List[IHTTPRateService] = [BitFinexRateService(), KrakenFinexRateService()]
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedges_fired: int = 0
+    wins: Dict[str, int] = field(default_factory=dict)
+
+
+def is_valid_rate(rate: Any) -> bool:
+    return isinstance(rate, Decimal) and rate.is_finite() and rate > 0
+
+
+@dataclass
+class SubstitutableHTTPRateService(IRateService, IProviderRateService):
+    services: List[IHTTPRateService] = field(default_factory=default_rate_services)
+    breaker_factory: Callable[[], CircuitBreaker] = field(default=CircuitBreaker)
+    # None tries the providers one after another
+    hedge_delay_s: Optional[float] = None
+    router: LatencyRouter = field(default_factory=LatencyRouter)
+    clock: Callable[[], float] = field(default=monotonic)
+    breakers: Dict[str, CircuitBreaker] = field(init=False, default_factory=dict)
+    hedge_stats: HedgeStats = field(init=False, default_factory=HedgeStats)
+    _executor: ThreadPoolExecutor = field(
+        init=False,
+        default_factory=lambda: ThreadPoolExecutor(thread_name_prefix="rate-hedge"),
+    )
+    _stats_lock: Lock = field(init=False, default_factory=Lock)
+
+    def __post_init__(self) -> None:
+        self.breakers = {
+            service.name: self.breaker_factory() for service in self.services
+        }
 
     def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
-        for service in self.services:
-            if service.ping:  # type: ignore
-                return service.get_rate(from_currency, to_currency)
+        rate, _ = self.get_rate_with_provider(from_currency, to_currency)
+        return rate
+
+    def get_rate_with_provider(
+        self, from_currency: Currency, to_currency: Currency
+    ) -> Tuple[Decimal, str]:
+        if self.hedge_delay_s is not None:
+            return self._get_hedged_rate(from_currency, to_currency, self.hedge_delay_s)
+
+        for service in self._ranked_services():
+            if not self.breakers[service.name].allow_request():
+                continue
+            try:
+                return self._call(service, from_currency, to_currency)
+            except Exception:
+                continue
+        raise HTTPException(status_code=500, detail="Service unavailable")
+
+    def _get_hedged_rate(
+        self, from_currency: Currency, to_currency: Currency, delay_s: float
+    ) -> Tuple[Decimal, str]:
+        candidates = iter(self._ranked_services())
+        pending: Set[Future[Tuple[Decimal, str]]] = set()
+
+        def submit_next() -> bool:
+            for service in candidates:
+                if self.breakers[service.name].allow_request():
+                    pending.add(
+                        self._executor.submit(
+                            self._call, service, from_currency, to_currency
+                        )
+                    )
+                    return True
+            return False
+
+        with self._stats_lock:
+            self.hedge_stats.requests += 1
+        submit_next()
+        hedged = False
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=None if hedged else delay_s,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                # primary is slow, race it against the next provider
+                hedged = True
+                if submit_next():
+                    with self._stats_lock:
+                        self.hedge_stats.hedges_fired += 1
+                continue
+
+            for future in done:
+                pending.discard(future)
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    rate, name = future.result()
+                    with self._stats_lock:
+                        wins = self.hedge_stats.wins
+                        wins[name] = wins.get(name, 0) + 1
+                    return rate, name
+            if not pending:
+                submit_next()
         raise HTTPException(status_code=500, detail="Service unavailable")
+
+    def _ranked_services(self) -> List[IHTTPRateService]:
+        by_name = {service.name: service for service in self.services}
+        return [by_name[name] for name in self.router.rank(list(by_name))]
+
+    def _call(
+        self, service: IHTTPRateService, from_currency: Currency, to_currency: Currency
+    ) -> Tuple[Decimal, str]:
+        breaker = self.breakers[service.name]
+        started = self.clock()
+        try:
+            rate = service.get_rate(from_currency, to_currency)
+            if not is_valid_rate(rate):
+                raise ValueError(f"invalid rate from {service.name}: {rate}")
+        except Exception:
+            self.router.record(service.name, self.clock() - started, False)
+            breaker.record_failure()
+            raise
+        self.router.record(service.name, self.clock() - started, True)
+        breaker.record_success()
+        return rate, service.name
+
+    def check_health(self) -> None:
+        # runs off the request path, see HealthMonitor
+        for service in self.services:
+            breaker = self.breakers[service.name]
+            try:
+                healthy = service.ping()
+            except Exception:
+                healthy = False
+            if healthy:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+
+def run_in_background(task: Callable[[], None]) -> None:
+    Thread(target=task, daemon=True).start()
+
+
+@dataclass(frozen=True)
+class CachedRate:
+    rate: Decimal
+    fetched_at: float
+
+
+@dataclass
+class CachingRateService(IRateService):
+    rate_service: IRateService
+    ttl_s: float = RATE_CACHE_TTL_S
+    clock: Callable[[], float] = field(default=monotonic)
+    background_strategy: Callable[[Callable[[], None]], None] = field(
+        default=run_in_background
+    )
+    _rates: Dict[Tuple[Currency, Currency], CachedRate] = field(
+        init=False, default_factory=dict
+    )
+    _refreshing: Set[Tuple[Currency, Currency]] = field(init=False, default_factory=set)
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        pair = (from_currency, to_currency)
+        cached = self._rates.get(pair)
+        if cached is None:
+            return self._refresh(pair)
+
+        # serve the stale rate, a single background refresh replaces it
+        if self.clock() - cached.fetched_at > self.ttl_s:
+            self._schedule_refresh(pair)
+        return cached.rate
+
+    def get_rate_age(
+        self, from_currency: Currency, to_currency: Currency
+    ) -> Optional[float]:
+        cached = self._rates.get((from_currency, to_currency))
+        if cached is None:
+            return None
+        return self.clock() - cached.fetched_at
+
+    def _schedule_refresh(self, pair: Tuple[Currency, Currency]) -> None:
+        with self._lock:
+            if pair in self._refreshing:
+                return
+            self._refreshing.add(pair)
+
+        def refresh() -> None:
+            try:
+                self._refresh(pair)
+            except Exception:
+                # keep serving the stale rate, next expired read retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(pair)
+
+        self.background_strategy(refresh)
+
+    def _refresh(self, pair: Tuple[Currency, Currency]) -> Decimal:
+        rate = self.rate_service.get_rate(*pair)
+        self._rates[pair] = CachedRate(rate, self.clock())
+        return rate
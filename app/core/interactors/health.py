@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Callable, Optional
+
+from app.core.constants.constants import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT_S,
+    HEALTH_CHECK_INTERVAL_S,
+)
+
+
+class BreakerState(Enum):
+    CLOSED = auto()
+    OPEN = auto()
+    HALF_OPEN = auto()
+
+
+@dataclass
+class CircuitBreaker:
+    failure_threshold: int = BREAKER_FAILURE_THRESHOLD
+    reset_timeout_s: float = BREAKER_RESET_TIMEOUT_S
+    clock: Callable[[], float] = field(default=monotonic)
+    state: BreakerState = field(init=False, default=BreakerState.CLOSED)
+    _failures: int = field(init=False, default=0)
+    _opened_at: float = field(init=False, default=0.0)
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == BreakerState.CLOSED:
+                return True
+            if (
+                self.state == BreakerState.OPEN
+                and self.clock() - self._opened_at >= self.reset_timeout_s
+            ):
+                # let exactly one caller through as a probe
+                self.state = BreakerState.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = BreakerState.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self.state == BreakerState.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self.state = BreakerState.OPEN
+                self._opened_at = self.clock()
+
+
+@dataclass
+class HealthMonitor:
+    check: Callable[[], None]
+    interval_s: float = HEALTH_CHECK_INTERVAL_S
+    _stopped: Event = field(init=False, default_factory=Event)
+    _thread: Optional[Thread] = field(init=False, default=None)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_s):
+            self.check()
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from threading import Event, Thread
+from time import time
+from typing import Callable, Optional, Protocol
+
+from fastapi import HTTPException
+
+from app.core.constants.constants import (
+    RATE_DEGRADED_AFTER_S,
+    RATE_MAX_STALENESS_S,
+    RATE_POLL_INTERVAL_S,
+)
+from app.core.interactors.conversion import (
+    Currency,
+    IProviderRateService,
+    IRateFreshness,
+    IRateService,
+    SubstitutableHTTPRateService,
+)
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    rate: Decimal
+    provider: str
+    fetched_at: float
+
+
+class IRateHistoryRepository(Protocol):
+    def record_rate(
+        self, from_currency: Currency, to_currency: Currency, snapshot: RateSnapshot
+    ) -> bool:
+        pass
+
+    def get_rate_at(
+        self, from_currency: Currency, to_currency: Currency, timestamp: float
+    ) -> Optional[RateSnapshot]:
+        pass
+
+
+@dataclass
+class RatePoller(IRateService, IRateFreshness):
+    rate_service: IProviderRateService = field(
+        default_factory=SubstitutableHTTPRateService
+    )
+    from_currency: Currency = Currency.BITCOIN
+    to_currency: Currency = Currency.USD
+    interval_s: float = RATE_POLL_INTERVAL_S
+    max_staleness_s: float = RATE_MAX_STALENESS_S
+    degraded_after_s: float = RATE_DEGRADED_AFTER_S
+    clock: Callable[[], float] = field(default=time)
+    history: Optional[IRateHistoryRepository] = None
+    # replaced as a whole on every refresh, readers never need a lock
+    snapshot: Optional[RateSnapshot] = field(init=False, default=None)
+    _stopped: Event = field(init=False, default_factory=Event)
+    _thread: Optional[Thread] = field(init=False, default=None)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self.refresh()
+        self._thread = Thread(target=self._run, name="rate-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def restore(self) -> Optional[RateSnapshot]:
+        # last known good rate, lets a cold start answer before the first poll
+        if self.history is None or self.snapshot is not None:
+            return self.snapshot
+        self.snapshot = self.history.get_rate_at(
+            self.from_currency, self.to_currency, self.clock()
+        )
+        return self.snapshot
+
+    def refresh(self) -> Optional[RateSnapshot]:
+        try:
+            rate, provider = self.rate_service.get_rate_with_provider(
+                self.from_currency, self.to_currency
+            )
+        except Exception:
+            # keep the previous snapshot, readers judge it by its age
+            return None
+        snapshot = self.snapshot = RateSnapshot(rate, provider, self.clock())
+        if self.history is not None:
+            try:
+                self.history.record_rate(self.from_currency, self.to_currency, snapshot)
+            except Exception:
+                # history is best effort, the live snapshot is already out
+                pass
+        return snapshot
+
+    def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        if (from_currency, to_currency) != (self.from_currency, self.to_currency):
+            raise HTTPException(status_code=500, detail="Rate is not polled")
+
+        snapshot = self.snapshot
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="Rate not available yet")
+        if self.clock() - snapshot.fetched_at > self.max_staleness_s:
+            raise HTTPException(status_code=503, detail="Rate is stale")
+        return snapshot.rate
+
+    def is_degraded(self) -> bool:
+        snapshot = self.snapshot
+        if snapshot is None:
+            return True
+        return self.clock() - snapshot.fetched_at > self.degraded_after_s
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_s):
+            self.refresh()
@@ -0,0 +1,101 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.clients.http import IHTTPClient, default_http_client
+from app.core.constants.constants import RATE_MATRIX_TTL_S
+from app.core.interactors.conversion import (
+    Currency,
+    IRateService,
+    bitfinex_mapper,
+    is_valid_rate,
+)
+
+BITFINEX_TICKERS_URL = "https://api-pub.bitfinex.com/v2/tickers?symbols="
+
+
+def bitfinex_tickers_parser(response: Dict[str, Any] | List[Any]) -> Dict[str, Decimal]:
+    # [[SYMBOL, BID, BID_SIZE, ASK, ASK_SIZE, DAILY_CHANGE,
+    #   DAILY_CHANGE_RELATIVE, LAST_PRICE, VOLUME, HIGH, LOW], ...]
+    # last trade price, like the single pair services
+    return {row[0]: Decimal(str(row[7])) for row in response}
+
+
+def bitfinex_symbol(base: str, quote: str) -> str:
+    return f"t{base}{quote}"
+
+
+@dataclass(frozen=True)
+class RateMatrix:
+    # units of each currency per one unit of the base currency
+    prices: Mapping[Currency, Decimal]
+    fetched_at: float
+
+    def rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        try:
+            return self.prices[to_currency] / self.prices[from_currency]
+        except KeyError:
+            raise HTTPException(status_code=400, detail="Currency not supported")
+
+
+@dataclass
+class RateMatrixService(IRateService):
+    currencies: Tuple[Currency, ...] = (
+        Currency.USD,
+        Currency.EUR,
+        Currency.GBP,
+        Currency.JPY,
+    )
+    base: Currency = Currency.BITCOIN
+    http_client: IHTTPClient = field(default_factory=default_http_client)
+    tickers_url: str = BITFINEX_TICKERS_URL
+    currency_mapper: MappingProxyType[Currency, str] = bitfinex_mapper
+    symbol_strategy: Callable[[str, str], str] = bitfinex_symbol
+    tickers_parsing_strategy: Callable[
+        [Dict[str, Any] | List[Any]], Dict[str, Decimal]
+    ] = bitfinex_tickers_parser
+    ttl_s: float = RATE_MATRIX_TTL_S
+    clock: Callable[[], float] = field(default=monotonic)
+    _matrix: Optional[RateMatrix] = field(init=False, default=None)
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        if from_currency == to_currency:
+            return Decimal(1)
+        return self.get_matrix().rate(from_currency, to_currency)
+
+    def get_matrix(self) -> RateMatrix:
+        matrix = self._matrix
+        if matrix is not None and not self._expired(matrix):
+            return matrix
+        with self._lock:
+            # whoever held the lock may have refreshed it already
+            matrix = self._matrix
+            if matrix is None or self._expired(matrix):
+                matrix = self._matrix = self._fetch()
+        return matrix
+
+    def _expired(self, matrix: RateMatrix) -> bool:
+        return self.clock() - matrix.fetched_at > self.ttl_s
+
+    def _fetch(self) -> RateMatrix:
+        symbols = {
+            currency: self.symbol_strategy(
+                self.currency_mapper[self.base], self.currency_mapper[currency]
+            )
+            for currency in self.currencies
+        }
+        response = self.http_client.get(self.tickers_url + ",".join(symbols.values()))
+        tickers = self.tickers_parsing_strategy(response)
+
+        prices = {self.base: Decimal(1)}
+        for currency, symbol in symbols.items():
+            price = tickers.get(symbol)
+            if price is not None and is_valid_rate(price):
+                prices[currency] = price
+        return RateMatrix(MappingProxyType(prices), self.clock())
@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from random import Random
+from threading import Lock
+from typing import Dict, List, Sequence
+
+from app.core.constants.constants import (
+    ROUTING_ERROR_PENALTY_S,
+    ROUTING_EWMA_ALPHA,
+    ROUTING_PROBE_RATIO,
+)
+
+
+@dataclass
+class ProviderScore:
+    latency_s: float = 0.0
+    error_rate: float = 0.0
+    samples: int = 0
+
+
+@dataclass
+class LatencyRouter:
+    alpha: float = ROUTING_EWMA_ALPHA
+    probe_ratio: float = ROUTING_PROBE_RATIO
+    error_penalty_s: float = ROUTING_ERROR_PENALTY_S
+    rng: Random = field(default_factory=Random)
+    scores: Dict[str, ProviderScore] = field(init=False, default_factory=dict)
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def record(self, name: str, latency_s: float, succeeded: bool) -> None:
+        error = 0.0 if succeeded else 1.0
+        with self._lock:
+            score = self.scores.setdefault(name, ProviderScore())
+            if score.samples == 0:
+                score.latency_s, score.error_rate = latency_s, error
+            else:
+                score.latency_s += self.alpha * (latency_s - score.latency_s)
+                score.error_rate += self.alpha * (error - score.error_rate)
+            score.samples += 1
+
+    def cost(self, name: str) -> float:
+        # providers without samples rank first so they get measured
+        score = self.scores.get(name)
+        if score is None:
+            return 0.0
+        return score.latency_s + score.error_rate * self.error_penalty_s
+
+    def rank(self, names: Sequence[str]) -> List[str]:
+        ranked = sorted(names, key=self.cost)
+        if len(ranked) > 1 and self.rng.random() < self.probe_ratio:
+            # keep measuring the others so a recovered provider can win again
+            probe = ranked.pop(self.rng.randrange(1, len(ranked)))
+            ranked.insert(0, probe)
+        return ranked
@@ -1,8 +1,24 @@
-from dataclasses import dataclass
-from typing import List, Protocol, Tuple
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from math import ceil, floor
+from time import time
+from typing import Callable, Iterator, List, Optional, Protocol, Tuple
 
+from app.core.constants.constants import (
+    STATISTICS_DEFAULT_BUCKETS,
+    STATISTICS_MAX_BUCKETS,
+    TRANSACTIONS_EXPORT_BATCH_SIZE,
+    TRANSACTIONS_PAGE_SIZE,
+)
+from app.core.models.req.statistics import BUCKET_SECONDS, StatisticsBucket
 from app.core.models.resp.core_response import CoreResponse, CoreStatus
-from app.core.models.resp.statistics import StatisticsResponse
+from app.core.models.resp.statistics import (
+    StatisticsBucketResponse,
+    StatisticsRangeResponse,
+    StatisticsResponse,
+)
 from app.core.models.resp.transaction import (
     GetTransactionsResponse,
     TransactionResponse,
@@ -14,16 +30,46 @@ class ITransactionsRepository(Protocol):
         pass
 
     def create_transaction(
-        self, from_id: int, to_id: int, amount: int, commission_satoshi: int
+        self,
+        from_id: int,
+        to_id: int,
+        amount: int,
+        commission_satoshi: int,
+        created_at: float,
+    ) -> bool:
+        pass
+
+    def transfer(
+        self,
+        from_id: int,
+        to_id: int,
+        amount: int,
+        commission_satoshi: int,
+        created_at: float,
     ) -> bool:
         pass
 
     def get_transactions(self, wallet_ids: List[int]) -> List[TransactionResponse]:
         pass
 
+    def get_transactions_page(
+        self, wallet_ids: List[int], limit: int, before_id: Optional[int]
+    ) -> List[Tuple[int, TransactionResponse]]:
+        pass
+
+    def iter_transactions(
+        self, wallet_ids: List[int], batch_size: int
+    ) -> Iterator[TransactionResponse]:
+        pass
+
     def get_statistics(self) -> Tuple[int, int]:
         pass
 
+    def get_statistics_rollups(
+        self, bucket: StatisticsBucket, start: int, end: int
+    ) -> List[Tuple[int, int, int, int]]:
+        pass
+
 
 class ITransactionsInteractor(Protocol):
     def create(
@@ -31,19 +77,77 @@ class ITransactionsInteractor(Protocol):
     ) -> CoreResponse[None]:
         pass
 
-    def get(self, wallet_ids: List[int]) -> CoreResponse[GetTransactionsResponse]:
+    def transfer(
+        self, from_id: int, to_id: int, amount: int, commission_satoshi: int
+    ) -> CoreResponse[None]:
+        pass
+
+    def get(
+        self,
+        wallet_ids: List[int],
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> CoreResponse[GetTransactionsResponse]:
+        pass
+
+    def stream(
+        self, wallet_ids: List[int]
+    ) -> CoreResponse[Iterator[TransactionResponse]]:
         pass
 
     def get_statistics(self) -> CoreResponse[StatisticsResponse]:
         pass
 
+    def get_statistics_range(
+        self,
+        bucket: StatisticsBucket,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> CoreResponse[StatisticsRangeResponse]:
+        pass
+
 
 DEFAULT_MESSAGE = "empty message body"
+CURSOR_PREFIX = "tx:"
+# sqlite integers are signed 64 bit
+MAX_TRANSACTION_ID = 2**63 - 1
+
+
+def encode_cursor(transaction_id: int) -> str:
+    encoded = urlsafe_b64encode(f"{CURSOR_PREFIX}{transaction_id}".encode())
+    # unpadded so the cursor can go into a query string as is
+    return encoded.decode().rstrip("=")
+
+
+def to_timestamp(moment: datetime) -> float:
+    # naive datetimes are read as UTC, like the buckets themselves
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    try:
+        decoded = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (Base64Error, UnicodeDecodeError, ValueError):
+        return None
+    if not decoded.startswith(CURSOR_PREFIX):
+        return None
+    digits = decoded.removeprefix(CURSOR_PREFIX)
+    # str.isdigit also accepts digits like "²" that int() rejects
+    if not (digits.isascii() and digits.isdecimal()):
+        return None
+    try:
+        transaction_id = int(digits)
+    except ValueError:
+        return None
+    return transaction_id if 0 < transaction_id <= MAX_TRANSACTION_ID else None
 
 
 @dataclass
 class TransactionsInteractor:
     transaction_repository: ITransactionsRepository
+    clock: Callable[[], float] = field(default=time)
     tag = "transactions"
 
     def create(
@@ -58,6 +162,7 @@ class TransactionsInteractor:
             to_id=to_id,
             amount=amount,
             commission_satoshi=commission_satoshi,
+            created_at=self.clock(),
         )
         response: CoreResponse[None] = CoreResponse(None)
         response.status = (
@@ -68,7 +173,37 @@ class TransactionsInteractor:
         response.message = f"{self.tag} {DEFAULT_MESSAGE}"
         return response
 
-    def get(self, wallet_ids: List[int]) -> CoreResponse[GetTransactionsResponse]:
+    def transfer(
+        self, from_id: int, to_id: int, amount: int, commission_satoshi: int
+    ) -> CoreResponse[None]:
+        transferred = self.transaction_repository.transfer(
+            from_id=from_id,
+            to_id=to_id,
+            amount=amount,
+            commission_satoshi=commission_satoshi,
+            created_at=self.clock(),
+        )
+        if not transferred:
+            return CoreResponse(
+                response_content=None,
+                status=CoreStatus.INSUFFICIENT_FUNDS,
+                message="insufficient funds",
+            )
+        return CoreResponse(
+            response_content=None,
+            status=CoreStatus.SUCCESSFUL_POST,
+            message="Transaction completed successfully",
+        )
+
+    def get(
+        self,
+        wallet_ids: List[int],
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> CoreResponse[GetTransactionsResponse]:
+        if limit is not None or cursor is not None:
+            return self._get_page(wallet_ids, limit or TRANSACTIONS_PAGE_SIZE, cursor)
+
         my_transactions: List[
             TransactionResponse
         ] = self.transaction_repository.get_transactions(wallet_ids=wallet_ids)
@@ -79,6 +214,42 @@ class TransactionsInteractor:
         response.message = f"{self.tag} {DEFAULT_MESSAGE}"
         return response
 
+    def stream(
+        self, wallet_ids: List[int]
+    ) -> CoreResponse[Iterator[TransactionResponse]]:
+        return CoreResponse(
+            response_content=self.transaction_repository.iter_transactions(
+                wallet_ids, TRANSACTIONS_EXPORT_BATCH_SIZE
+            ),
+            status=CoreStatus.SUCCESSFUL_GET,
+            message=f"{self.tag} {DEFAULT_MESSAGE}",
+        )
+
+    def _get_page(
+        self, wallet_ids: List[int], limit: int, cursor: Optional[str]
+    ) -> CoreResponse[GetTransactionsResponse]:
+        before_id = None if cursor is None else decode_cursor(cursor)
+        if cursor is not None and before_id is None:
+            return CoreResponse(
+                response_content=GetTransactionsResponse([]),
+                status=CoreStatus.INVALID_REQUEST,
+                message=f"invalid cursor: {cursor}",
+            )
+
+        # one extra row tells whether another page exists
+        rows = self.transaction_repository.get_transactions_page(
+            wallet_ids, limit + 1, before_id
+        )
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1][0]) if len(rows) > limit else None
+        return CoreResponse(
+            response_content=GetTransactionsResponse(
+                [transaction for _, transaction in page], next_cursor
+            ),
+            status=CoreStatus.SUCCESSFUL_GET,
+            message=f"{self.tag} {DEFAULT_MESSAGE}",
+        )
+
     def get_statistics(self) -> CoreResponse[StatisticsResponse]:
         total_count, profit = self.transaction_repository.get_statistics()
         response: CoreResponse[StatisticsResponse] = CoreResponse(
@@ -87,3 +258,53 @@ class TransactionsInteractor:
             message="Success",
         )
         return response
+
+    def get_statistics_range(
+        self,
+        bucket: StatisticsBucket,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> CoreResponse[StatisticsRangeResponse]:
+        seconds = BUCKET_SECONDS[bucket]
+        end_at = self.clock() if end is None else to_timestamp(end)
+        start_at = end_at if start is None else to_timestamp(start)
+        # buckets holding either end of the range are reported whole
+        last_bucket_end = ceil(end_at / seconds) * seconds
+        first_bucket = (
+            last_bucket_end - STATISTICS_DEFAULT_BUCKETS * seconds
+            if start is None
+            else floor(start_at / seconds) * seconds
+        )
+        bucket_starts = range(first_bucket, last_bucket_end, seconds)
+        if start_at > end_at or len(bucket_starts) > STATISTICS_MAX_BUCKETS:
+            return CoreResponse(
+                response_content=StatisticsRangeResponse(bucket.value, []),
+                status=CoreStatus.INVALID_REQUEST,
+                message=f"range must cover 0 to {STATISTICS_MAX_BUCKETS} buckets",
+            )
+
+        rollups = {
+            bucket_start: (count, volume, profit)
+            for bucket_start, count, volume, profit in (
+                self.transaction_repository.get_statistics_rollups(
+                    bucket, bucket_starts.start, bucket_starts.stop
+                )
+            )
+        }
+        # quiet buckets are reported as zeros so charts keep their time axis
+        buckets: List[StatisticsBucketResponse] = []
+        for bucket_start in bucket_starts:
+            count, volume, profit = rollups.get(bucket_start, (0, 0, 0))
+            buckets.append(
+                StatisticsBucketResponse(
+                    datetime.fromtimestamp(bucket_start, timezone.utc),
+                    count,
+                    volume,
+                    profit,
+                )
+            )
+        return CoreResponse(
+            response_content=StatisticsRangeResponse(bucket.value, buckets),
+            status=CoreStatus.SUCCESSFUL_GET,
+            message="Success",
+        )
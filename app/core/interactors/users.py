@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from hashlib import sha256
-from typing import Callable, Protocol
+from typing import Callable, Dict, List, Optional, Protocol
 
 from app.core.constants.constants import KEY_FOR_API_KEY_GEN
 from app.core.models.req.user import CreateUserRequest
@@ -8,6 +8,25 @@ from app.core.models.resp.core_response import CoreResponse, CoreStatus
 from app.core.models.resp.user import CreateUserResponse
 
 
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    # address -> wallet_id of every wallet the user owns
+    wallets: Dict[str, int] = field(default_factory=dict)
+
+    def wallet_ids(self) -> List[int]:
+        return list(self.wallets.values())
+
+    def wallet_id(self, address: str) -> int:
+        return self.wallets.get(address, -1)
+
+    def owns(self, wallet_id: int) -> bool:
+        return wallet_id in self.wallets.values()
+
+
+AnonymousPrincipal = Principal(-1)
+
+
 class IUsersRepository(Protocol):
     def create_user(self, email: str, api_key: str) -> bool:
         pass
@@ -18,6 +37,9 @@ class IUsersRepository(Protocol):
     def get_user_id(self, api_key: str) -> int:
         pass
 
+    def get_principal(self, api_key: str) -> Optional[Principal]:
+        pass
+
 
 class IUsersInteractor(Protocol):
     def create_user(
@@ -28,6 +50,9 @@ class IUsersInteractor(Protocol):
     def get_user_id(self, api_key: str | None) -> CoreResponse[int]:
         pass
 
+    def get_principal(self, api_key: str | None) -> CoreResponse[Principal]:
+        pass
+
 
 def _sha_256_using_hardcoded_key(email: str) -> str:
     return sha256(f"{email}~{KEY_FOR_API_KEY_GEN}".encode()).hexdigest()
@@ -68,6 +93,20 @@ class UserInteractor:
             return self._get_could_not_authenticate_response(api_key)
         return CoreResponse(response_content=user_id, status=CoreStatus.SUCCESSFUL_GET)
 
+    def get_principal(self, api_key: str | None) -> CoreResponse[Principal]:
+        principal = (
+            None if api_key is None else self.user_repository.get_principal(api_key)
+        )
+        if principal is None:
+            return CoreResponse(
+                response_content=AnonymousPrincipal,
+                status=CoreStatus.INVALID_API_KEY,
+                message=f"api_key: {api_key} is invalid",
+            )
+        return CoreResponse(
+            response_content=principal, status=CoreStatus.SUCCESSFUL_GET
+        )
+
     @classmethod
     def _get_could_not_authenticate_response(
         cls, api_key: str | None
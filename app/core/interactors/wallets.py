@@ -1,27 +1,60 @@
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Protocol
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
 
 from app.core.constants.constants import WALLET_LIMIT_PER_USER
 from app.core.interactors.conversion import (
+    CachingRateService,
     Currency,
+    IRateFreshness,
     IRateService,
     SubstitutableHTTPRateService,
 )
+from app.core.interactors.users import Principal
 from app.core.models.resp.core_response import CoreResponse, CoreStatus
-from app.core.models.resp.wallet import BadWalletResponse, WalletResponse
+from app.core.models.resp.wallet import (
+    BadWalletResponse,
+    GetWalletsResponse,
+    WalletResponse,
+)
+from app.core.money import (
+    bitcoin_to_satoshi,
+    satoshi_to_usd,
+    scale_rate,
+)
+
+
+@dataclass(frozen=True)
+class WalletRef:
+    wallet_id: int
+    user_id: int
+
+
+@dataclass(frozen=True)
+class WalletCreation:
+    # None when the limit was reached or the address is taken
+    wallet: Optional[WalletRef]
+    limit_reached: bool = False
 
 
 class IWalletsRepository(Protocol):
     def create_wallet(self, user_id: int, address: str, init_balance: int) -> bool:
         pass
 
+    def create_wallet_within_limit(
+        self, user_id: int, address: str, init_balance: int, limit: int
+    ) -> WalletCreation:
+        pass
+
     def get_wallet_id(self, address: str) -> int:
         pass
 
     def get_user_wallets(self, user_id: int) -> List[int]:
         pass
 
+    def get_user_wallet_balances(self, user_id: int) -> List[Tuple[str, int]]:
+        pass
+
     def check_wallet_validity(self, wallet_address: str) -> int:
         pass
 
@@ -31,10 +64,20 @@ class IWalletsRepository(Protocol):
     def set_balance(self, address: str, amount: int) -> bool:
         pass
 
+    def find_wallet(self, address: str) -> Optional[WalletRef]:
+        pass
+
+    def get_recent_wallets(self, limit: int) -> Dict[str, WalletRef]:
+        pass
+
 
 class IWalletsInteractor(Protocol):
     def create_wallet(
-        self, user_id: int, address: str, init_balance: int
+        self,
+        user_id: int,
+        address: str,
+        init_balance: int,
+        include_usd: bool = True,
     ) -> CoreResponse[WalletResponse]:
         pass
 
@@ -44,10 +87,17 @@ class IWalletsInteractor(Protocol):
     def get_user_wallets(self, user_id: int) -> CoreResponse[List[int]]:
         pass
 
+    def get_user_wallet_balances(
+        self, user_id: int, include_usd: bool = True
+    ) -> CoreResponse[GetWalletsResponse]:
+        pass
+
     def check_wallet_exists(self, address: str) -> CoreResponse[int]:
         pass
 
-    def get_wallet_balance(self, address: str) -> CoreResponse[WalletResponse]:
+    def get_wallet_balance(
+        self, address: str, include_usd: bool = True
+    ) -> CoreResponse[WalletResponse]:
         pass
 
     def check_wallet_belongs_to_user(
@@ -55,6 +105,11 @@ class IWalletsInteractor(Protocol):
     ) -> CoreResponse[bool]:
         pass
 
+    def check_principal_owns(
+        self, principal: Principal, address: str
+    ) -> CoreResponse[int]:
+        pass
+
     def update_balance(self, address: str, amount: int) -> CoreResponse[None]:
         pass
 
@@ -63,18 +118,31 @@ class BitcoinToUsdConverter(Protocol):
     def convert_to_usd(self, bitcoin: Decimal) -> Decimal:
         pass
 
+    def convert_many(self, satoshi_amounts: Sequence[int]) -> List[Decimal]:
+        pass
+
+    def rate_is_degraded(self) -> bool:
+        pass
+
 
 @dataclass
 class HTTPConverter(BitcoinToUsdConverter):
-    rate_service: IRateService = field(default=SubstitutableHTTPRateService())
+    rate_service: IRateService = field(
+        default_factory=lambda: CachingRateService(SubstitutableHTTPRateService())
+    )
+    freshness: Optional[IRateFreshness] = None
 
     def convert_to_usd(self, bitcoin: Decimal) -> Decimal:
-        converted = Decimal(
-            Decimal(
-                self.rate_service.get_rate(Currency.BITCOIN, Currency.USD) * bitcoin
-            )
+        return self.convert_many([bitcoin_to_satoshi(bitcoin)])[0]
+
+    def convert_many(self, satoshi_amounts: Sequence[int]) -> List[Decimal]:
+        scaled_rate = scale_rate(
+            self.rate_service.get_rate(Currency.BITCOIN, Currency.USD)
         )
-        return converted.quantize(Decimal("0.01"))
+        return [satoshi_to_usd(satoshi, scaled_rate) for satoshi in satoshi_amounts]
+
+    def rate_is_degraded(self) -> bool:
+        return self.freshness is not None and self.freshness.is_degraded()
 
 
 @dataclass
@@ -83,20 +151,24 @@ class WalletsInteractor:
     converter: BitcoinToUsdConverter = field(default_factory=HTTPConverter)
 
     def create_wallet(
-        self, user_id: int, address: str, init_balance: int
+        self,
+        user_id: int,
+        address: str,
+        init_balance: int,
+        include_usd: bool = True,
     ) -> CoreResponse[WalletResponse]:
-        wallets = self.get_user_wallets(user_id).response_content
+        creation = self.wallet_repository.create_wallet_within_limit(
+            user_id, address, init_balance, WALLET_LIMIT_PER_USER
+        )
 
-        if len(wallets) >= WALLET_LIMIT_PER_USER:
+        if creation.limit_reached:
             return CoreResponse(
                 response_content=BadWalletResponse,
                 status=CoreStatus.WALLET_LIMIT_REACHED,
                 message=f"can't have more than {WALLET_LIMIT_PER_USER} wallets",
             )
 
-        created = self.wallet_repository.create_wallet(user_id, address, init_balance)
-
-        if not created:
+        if creation.wallet is None:
             return CoreResponse(
                 response_content=BadWalletResponse,
                 status=CoreStatus.WALLET_ADDRESS_TAKEN,
@@ -104,11 +176,7 @@ class WalletsInteractor:
             )
 
         return CoreResponse(
-            response_content=WalletResponse(
-                address,
-                init_balance,
-                self.converter.convert_to_usd(Decimal(init_balance / 100000000)),
-            ),
+            response_content=self._to_response(address, init_balance, include_usd),
             status=CoreStatus.SUCCESSFUL_POST,
             message=f"created wallet {address}",
         )
@@ -138,6 +206,34 @@ class WalletsInteractor:
             message=f"got wallets for user: {user_id}",
         )
 
+    def get_user_wallet_balances(
+        self, user_id: int, include_usd: bool = True
+    ) -> CoreResponse[GetWalletsResponse]:
+        balances = self.wallet_repository.get_user_wallet_balances(user_id)
+        # an empty list has nothing to value, don't wait on the rate for it
+        if include_usd and balances:
+            # one rate lookup for the whole list
+            usd_balances: List[Optional[Decimal]] = list(
+                self.converter.convert_many([balance for _, balance in balances])
+            )
+            degraded = self.converter.rate_is_degraded()
+        else:
+            usd_balances = [None] * len(balances)
+            degraded = False
+
+        return CoreResponse(
+            response_content=GetWalletsResponse(
+                [
+                    WalletResponse(address, satoshi_balance, usd_balance, degraded)
+                    for (address, satoshi_balance), usd_balance in zip(
+                        balances, usd_balances
+                    )
+                ]
+            ),
+            status=CoreStatus.SUCCESSFUL_GET,
+            message=f"got wallet balances for user: {user_id}",
+        )
+
     def check_wallet_exists(self, address: str) -> CoreResponse[int]:
         valid = self.wallet_repository.check_wallet_validity(address)
 
@@ -154,7 +250,9 @@ class WalletsInteractor:
             message=f"wallet address: {address} valid",
         )
 
-    def get_wallet_balance(self, address: str) -> CoreResponse[WalletResponse]:
+    def get_wallet_balance(
+        self, address: str, include_usd: bool = True
+    ) -> CoreResponse[WalletResponse]:
         valid = self.wallet_repository.check_wallet_validity(address)
 
         if valid < 0:
@@ -165,11 +263,8 @@ class WalletsInteractor:
             )
 
         satoshi_balance = self.wallet_repository.get_wallet_balance(address)
-        usd_balance = self.converter.convert_to_usd(
-            Decimal(satoshi_balance / 100000000)
-        )
         return CoreResponse(
-            response_content=WalletResponse(address, satoshi_balance, usd_balance),
+            response_content=self._to_response(address, satoshi_balance, include_usd),
             status=CoreStatus.SUCCESSFUL_GET,
             message=f"successfully retrieved balance for address: {address}",
         )
@@ -195,6 +290,40 @@ class WalletsInteractor:
             message="Wallet belongs to user",
         )
 
+    def _to_response(
+        self, address: str, satoshi_balance: int, include_usd: bool
+    ) -> WalletResponse:
+        if not include_usd:
+            # satoshi only reads never touch the rate service
+            return WalletResponse(address, satoshi_balance, None)
+        (usd_balance,) = self.converter.convert_many([satoshi_balance])
+        return WalletResponse(
+            address, satoshi_balance, usd_balance, self.converter.rate_is_degraded()
+        )
+
+    def check_principal_owns(
+        self, principal: Principal, address: str
+    ) -> CoreResponse[int]:
+        wallet_id = principal.wallet_id(address)
+        if wallet_id == -1:
+            # only the failure path needs the database, to word the message
+            exists = self.wallet_repository.get_wallet_id(address) != -1
+            return CoreResponse(
+                response_content=-1,
+                status=CoreStatus.WALLET_DOESNT_BELONG_TO_USER,
+                message=(
+                    "Wallet does not belong to user"
+                    if exists
+                    else "Wallet with that address does not exist"
+                ),
+            )
+
+        return CoreResponse(
+            response_content=wallet_id,
+            status=CoreStatus.SUCCESSFUL_GET,
+            message="Wallet belongs to user",
+        )
+
     def update_balance(self, address: str, amount: int) -> CoreResponse[None]:
         self.wallet_repository.set_balance(address, amount)
         return CoreResponse(
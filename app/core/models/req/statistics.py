@@ -0,0 +1,14 @@
+from enum import Enum
+from typing import Dict
+
+
+class StatisticsBucket(Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+# buckets are aligned to the unix epoch, so days are UTC days
+BUCKET_SECONDS: Dict[StatisticsBucket, int] = {
+    StatisticsBucket.HOUR: 60 * 60,
+    StatisticsBucket.DAY: 24 * 60 * 60,
+}
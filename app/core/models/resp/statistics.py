@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from datetime import datetime
+from typing import List
 
 
 @dataclass
@@ -8,3 +10,17 @@ class StatisticsResponse:
 
 
 BadStatisticsResponse = StatisticsResponse(0, 0)
+
+
+@dataclass
+class StatisticsBucketResponse:
+    start: datetime
+    num_transaction: int
+    volume_in_satoshi: int
+    profit_in_satoshi: int
+
+
+@dataclass
+class StatisticsRangeResponse:
+    bucket: str
+    buckets: List[StatisticsBucketResponse]
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 
 @dataclass
@@ -12,3 +12,5 @@ class TransactionResponse:
 @dataclass
 class GetTransactionsResponse:
     transactions: List[TransactionResponse]
+    # set when a page was requested and older transactions remain
+    next_cursor: Optional[str] = None
@@ -1,12 +1,20 @@
 from dataclasses import dataclass
 from decimal import Decimal
+from typing import List, Optional
 
 
 @dataclass
 class WalletResponse:
     address: str
     satoshi_balance: int
-    usd_balance: Decimal
+    # None when the caller did not ask for a usd valuation
+    usd_balance: Optional[Decimal]
+    usd_rate_degraded: bool = False
+
+
+@dataclass
+class GetWalletsResponse:
+    wallets: List[WalletResponse]
 
 
 # not meant to be read, just a placeholder to avoid using optionals
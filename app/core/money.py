@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+SATOSHI_PER_BITCOIN = 100000000
+CENTS_PER_DOLLAR = 100
+BASIS_POINTS = 10000
+# rates are carried as integers with 8 decimal places, enough for any exchange quote
+RATE_SCALE = 10**8
+CENT = Decimal("0.01")
+_CENTS_DENOMINATOR = SATOSHI_PER_BITCOIN * RATE_SCALE // CENTS_PER_DOLLAR
+
+
+def divide_half_even(numerator: int, denominator: int) -> int:
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (
+        2 * remainder == denominator and quotient % 2 == 1
+    ):
+        quotient += 1
+    return quotient
+
+
+def divide_ceil(numerator: int, denominator: int) -> int:
+    return -(-numerator // denominator)
+
+
+def scale_rate(rate: Decimal) -> int:
+    return int((rate * RATE_SCALE).to_integral_value())
+
+
+def bitcoin_to_satoshi(bitcoin: Decimal) -> int:
+    return int((bitcoin * SATOSHI_PER_BITCOIN).to_integral_value())
+
+
+def satoshi_to_bitcoin(satoshi: int) -> Decimal:
+    return Decimal(satoshi).scaleb(-8)
+
+
+def satoshi_to_cents(satoshi: int, scaled_rate: int) -> int:
+    return divide_half_even(satoshi * scaled_rate, _CENTS_DENOMINATOR)
+
+
+def cents_to_usd(cents: int) -> Decimal:
+    # exact, the product keeps the two decimal places of CENT
+    return Decimal(cents) * CENT
+
+
+def satoshi_to_usd(satoshi: int, scaled_rate: int) -> Decimal:
+    return cents_to_usd(satoshi_to_cents(satoshi, scaled_rate))
+
+
+def fee(amount: int, basis_points: int) -> int:
+    # fees always round up, the platform never undercharges by a satoshi
+    return divide_ceil(amount * basis_points, BASIS_POINTS)
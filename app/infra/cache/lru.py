@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class LRUCache(Generic[K, V]):
+    max_size: int = 10000
+    hits: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    _entries: "OrderedDict[K, V]" = field(init=False, default_factory=OrderedDict)
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: K, value: V) -> Optional[Tuple[K, V]]:
+        # returns the evicted entry, if any
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                return self._entries.popitem(last=False)
+            return None
+
+    def invalidate(self, key: K) -> Optional[V]:
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[K, V], bool]) -> int:
+        with self._lock:
+            stale = [
+                key for key, value in self._entries.items() if predicate(key, value)
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,132 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, Optional, Set
+
+from app.core.interactors.users import IUsersRepository, Principal
+from app.infra.cache.lru import LRUCache
+
+
+@dataclass
+class CachedUsersRepository(IUsersRepository):
+    users_repository: IUsersRepository
+    max_keys: int = 10000
+    max_invalid_keys: int = 10000
+    # api_key -> principal, unknown keys live apart so guessing can't evict real ones
+    principals: LRUCache[str, Principal] = field(init=False)
+    invalid_keys: LRUCache[str, bool] = field(init=False)
+    # cached keys of every user, so invalidating a user only touches its entries
+    _keys_by_user: Dict[int, Set[str]] = field(init=False, default_factory=dict)
+    # every invalidation gets a generation, a lookup that started before one
+    # touching its key or user is not cached
+    _generation: int = field(init=False, default=0)
+    _cleared_at: int = field(init=False, default=0)
+    _invalidated_keys: Dict[str, int] = field(init=False, default_factory=dict)
+    _invalidated_users: Dict[int, int] = field(init=False, default_factory=dict)
+    _in_flight: "Counter[int]" = field(init=False, default_factory=Counter)
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def __post_init__(self) -> None:
+        self.principals = LRUCache(self.max_keys)
+        self.invalid_keys = LRUCache(self.max_invalid_keys)
+
+    def create_user(self, email: str, api_key: str) -> bool:
+        created = self.users_repository.create_user(email, api_key)
+        self.invalidate(api_key)
+        return created
+
+    def user_exists_with_email(self, email: str) -> bool:
+        return self.users_repository.user_exists_with_email(email)
+
+    def get_user_id(self, api_key: str) -> int:
+        principal = self.get_principal(api_key)
+        return -1 if principal is None else principal.user_id
+
+    def get_principal(self, api_key: str) -> Optional[Principal]:
+        principal = self.principals.get(api_key)
+        if principal is not None:
+            return principal
+        if self.invalid_keys.get(api_key):
+            return None
+
+        with self._lock:
+            started = self._generation
+            self._in_flight[started] += 1
+        try:
+            principal = self.users_repository.get_principal(api_key)
+        except Exception:
+            with self._lock:
+                self._finish(started)
+            raise
+        with self._lock:
+            if not self._raced(started, api_key, principal):
+                self._remember(api_key, principal)
+            self._finish(started)
+        return principal
+
+    def invalidate(self, api_key: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidated_keys[api_key] = self._generation
+            principal = self.principals.invalidate(api_key)
+            if principal is not None:
+                self._forget(api_key, principal.user_id)
+            self.invalid_keys.invalidate(api_key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        # owned wallets are part of the principal, called when one is created
+        with self._lock:
+            self._generation += 1
+            self._invalidated_users[user_id] = self._generation
+            for api_key in self._keys_by_user.pop(user_id, set()):
+                self.principals.invalidate(api_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._keys_by_user.clear()
+            self.principals.clear()
+            self.invalid_keys.clear()
+
+    def _raced(
+        self, started: int, api_key: str, principal: Optional[Principal]
+    ) -> bool:
+        if max(self._cleared_at, self._invalidated_keys.get(api_key, 0)) > started:
+            return True
+        return (
+            principal is not None
+            and self._invalidated_users.get(principal.user_id, 0) > started
+        )
+
+    def _finish(self, started: int) -> None:
+        self._in_flight[started] -= 1
+        if not self._in_flight[started]:
+            del self._in_flight[started]
+        # invalidations older than every running lookup can't affect any of them
+        oldest = min(self._in_flight, default=self._generation)
+        self._invalidated_keys = {
+            key: at for key, at in self._invalidated_keys.items() if at > oldest
+        }
+        self._invalidated_users = {
+            user_id: at
+            for user_id, at in self._invalidated_users.items()
+            if at > oldest
+        }
+
+    def _remember(self, api_key: str, principal: Optional[Principal]) -> None:
+        if principal is None:
+            self.invalid_keys.put(api_key, True)
+            return
+        self._keys_by_user.setdefault(principal.user_id, set()).add(api_key)
+        evicted = self.principals.put(api_key, principal)
+        if evicted is not None:
+            evicted_key, evicted_principal = evicted
+            self._forget(evicted_key, evicted_principal.user_id)
+
+    def _forget(self, api_key: str, user_id: int) -> None:
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(api_key)
+            if not keys:
+                del self._keys_by_user[user_id]
@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.constants.constants import WALLET_CACHE_SIZE
+from app.core.interactors.wallets import (
+    IWalletsRepository,
+    WalletCreation,
+    WalletRef,
+)
+from app.infra.cache.lru import LRUCache
+
+
+@dataclass
+class CachedWalletsRepository(IWalletsRepository):
+    wallets_repository: IWalletsRepository
+    max_wallets: int = WALLET_CACHE_SIZE
+    # told the owner of every new wallet, lets principal caches drop them
+    on_wallet_created: Callable[[int], None] = field(default=lambda user_id: None)
+    # addresses are never reassigned, entries only leave through eviction
+    refs: LRUCache[str, WalletRef] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.refs = LRUCache(self.max_wallets)
+
+    def preload(self, limit: int) -> int:
+        recent = self.wallets_repository.get_recent_wallets(limit)
+        for address, ref in recent.items():
+            self.refs.put(address, ref)
+        return len(recent)
+
+    def create_wallet(self, user_id: int, address: str, init_balance: int) -> bool:
+        created = self.wallets_repository.create_wallet(user_id, address, init_balance)
+        if created:
+            self.find_wallet(address)
+            self.on_wallet_created(user_id)
+        return created
+
+    def create_wallet_within_limit(
+        self, user_id: int, address: str, init_balance: int, limit: int
+    ) -> WalletCreation:
+        creation = self.wallets_repository.create_wallet_within_limit(
+            user_id, address, init_balance, limit
+        )
+        if creation.wallet is not None:
+            self.refs.put(address, creation.wallet)
+            self.on_wallet_created(user_id)
+        return creation
+
+    def get_wallet_id(self, address: str) -> int:
+        ref = self.find_wallet(address)
+        return -1 if ref is None else ref.wallet_id
+
+    def get_user_wallets(self, user_id: int) -> List[int]:
+        return self.wallets_repository.get_user_wallets(user_id)
+
+    def get_user_wallet_balances(self, user_id: int) -> List[Tuple[str, int]]:
+        return self.wallets_repository.get_user_wallet_balances(user_id)
+
+    def check_wallet_validity(self, wallet_address: str) -> int:
+        return self.get_wallet_id(wallet_address)
+
+    def get_wallet_balance(self, address: str) -> int:
+        return self.wallets_repository.get_wallet_balance(address)
+
+    def set_balance(self, address: str, amount: int) -> bool:
+        return self.wallets_repository.set_balance(address, amount)
+
+    def find_wallet(self, address: str) -> Optional[WalletRef]:
+        ref = self.refs.get(address)
+        if ref is None:
+            # unknown addresses are not remembered, they may be created later
+            ref = self.wallets_repository.find_wallet(address)
+            if ref is not None:
+                self.refs.put(address, ref)
+        return ref
+
+    def get_recent_wallets(self, limit: int) -> Dict[str, WalletRef]:
+        return self.wallets_repository.get_recent_wallets(limit)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 
 from app.core.facade import BitcoinWalletCore
-from app.core.models.resp.core_response import CoreStatus
-from app.core.models.resp.statistics import StatisticsResponse
+from app.core.models.req.statistics import StatisticsBucket
+from app.core.models.resp.core_response import CoreResponse, CoreStatus
+from app.core.models.resp.statistics import (
+    StatisticsRangeResponse,
+    StatisticsResponse,
+)
 from app.infra.fastAPI.dependables import get_core
 from app.infra.fastAPI.endpoints.status_mappings import to_http
 
@@ -13,9 +19,20 @@ statistics_api: APIRouter = APIRouter()
 def get_statistics(
     response: Response,
     admin_key: str | None = Header(None),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    bucket: StatisticsBucket | None = Query(None),
     core: BitcoinWalletCore = Depends(get_core),
-) -> StatisticsResponse:
-    core_response = core.get_statistics(admin_key)
+) -> StatisticsResponse | StatisticsRangeResponse:
+    core_response: (
+        CoreResponse[StatisticsResponse] | CoreResponse[StatisticsRangeResponse]
+    )
+    if start is None and end is None and bucket is None:
+        core_response = core.get_statistics(admin_key)
+    else:
+        core_response = core.get_statistics_range(
+            admin_key, bucket or StatisticsBucket.HOUR, start, end
+        )
     if core_response.status != CoreStatus.SUCCESSFUL_GET:
         raise HTTPException(to_http[core_response.status], detail=core_response.message)
     response.status_code = to_http[core_response.status]
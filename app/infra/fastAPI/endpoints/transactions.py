@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, Response
+import json
+from dataclasses import asdict
+from typing import Iterator
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.constants.constants import TRANSACTIONS_MAX_PAGE_SIZE
 from app.core.facade import BitcoinWalletCore
 from app.core.models.req.transaction import TransactionRequest
 from app.core.models.resp.core_response import CoreStatus
-from app.core.models.resp.transaction import GetTransactionsResponse
+from app.core.models.resp.transaction import (
+    GetTransactionsResponse,
+    TransactionResponse,
+)
 from app.infra.fastAPI.dependables import get_core
 from app.infra.fastAPI.endpoints.status_mappings import to_http
 
 transactions_api: APIRouter = APIRouter()
 
+NDJSON = "application/x-ndjson"
+
+
+def to_ndjson(transactions: Iterator[TransactionResponse]) -> Iterator[str]:
+    for transaction in transactions:
+        yield json.dumps(asdict(transaction)) + "\n"
+
 
 @transactions_api.post("/transactions", responses={201: {}, 400: {}, 403: {}, 404: {}})
 def make_transaction(
@@ -28,9 +44,11 @@ def make_transaction(
 def get_transactions(
     response: Response,
     api_key: str | None = Header(None),
+    limit: int | None = Query(None, ge=1, le=TRANSACTIONS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
     core: BitcoinWalletCore = Depends(get_core),
 ) -> GetTransactionsResponse:
-    core_response = core.get_transactions(api_key)
+    core_response = core.get_transactions(api_key, limit, cursor)
     if core_response.status != CoreStatus.SUCCESSFUL_GET:
         raise HTTPException(to_http[core_response.status], detail=core_response.message)
     response.status_code = to_http[core_response.status]
@@ -44,10 +62,44 @@ def get_transactions_for_wallet(
     response: Response,
     address: str,
     api_key: str | None = Header(None),
+    limit: int | None = Query(None, ge=1, le=TRANSACTIONS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
     core: BitcoinWalletCore = Depends(get_core),
 ) -> GetTransactionsResponse:
-    core_response = core.get_transactions_for_wallet(api_key, address)
+    core_response = core.get_transactions_for_wallet(api_key, address, limit, cursor)
     if core_response.status != CoreStatus.SUCCESSFUL_GET:
         raise HTTPException(to_http[core_response.status], detail=core_response.message)
     response.status_code = to_http[core_response.status]
     return core_response.response_content
+
+
+@transactions_api.get(
+    "/transactions/export", responses={200: {}, 400: {}, 403: {}, 404: {}}
+)
+def export_transactions(
+    api_key: str | None = Header(None),
+    core: BitcoinWalletCore = Depends(get_core),
+) -> StreamingResponse:
+    core_response = core.stream_transactions(api_key)
+    if core_response.status != CoreStatus.SUCCESSFUL_GET:
+        raise HTTPException(to_http[core_response.status], detail=core_response.message)
+    return StreamingResponse(
+        to_ndjson(core_response.response_content), media_type=NDJSON
+    )
+
+
+@transactions_api.get(
+    "/wallets/{address}/transaction/export",
+    responses={200: {}, 400: {}, 403: {}, 404: {}},
+)
+def export_transactions_for_wallet(
+    address: str,
+    api_key: str | None = Header(None),
+    core: BitcoinWalletCore = Depends(get_core),
+) -> StreamingResponse:
+    core_response = core.stream_transactions_for_wallet(api_key, address)
+    if core_response.status != CoreStatus.SUCCESSFUL_GET:
+        raise HTTPException(to_http[core_response.status], detail=core_response.message)
+    return StreamingResponse(
+        to_ndjson(core_response.response_content), media_type=NDJSON
+    )
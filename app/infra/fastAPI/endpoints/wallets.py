@@ -1,4 +1,9 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from dataclasses import asdict, fields
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from pydantic import BaseModel
 
 from app.core.facade import BitcoinWalletCore
 from app.core.models.resp.core_response import CoreStatus
@@ -8,29 +13,104 @@ from app.infra.fastAPI.endpoints.status_mappings import to_http
 
 wallets_api: APIRouter = APIRouter()
 
+WALLET_FIELDS = [wallet_field.name for wallet_field in fields(WalletResponse)]
+USD_FIELDS = {"usd_balance", "usd_rate_degraded"}
+
+
+class SelectedWallet(BaseModel):
+    # every field is optional in the schema, unselected ones are left unset
+    address: Optional[str] = None
+    satoshi_balance: Optional[int] = None
+    usd_balance: Optional[Decimal] = None
+    usd_rate_degraded: Optional[bool] = None
+
+
+class SelectedWallets(BaseModel):
+    wallets: List[SelectedWallet]
+
+
+def _parse_fields(requested: Optional[str]) -> List[str]:
+    if requested is None:
+        return WALLET_FIELDS
+    selected = [name.strip() for name in requested.split(",") if name.strip()]
+    if not selected:
+        raise HTTPException(
+            400, detail=f"fields must name at least one of: {', '.join(WALLET_FIELDS)}"
+        )
+    unknown = [name for name in selected if name not in WALLET_FIELDS]
+    if unknown:
+        raise HTTPException(400, detail=f"unknown wallet fields: {', '.join(unknown)}")
+    return selected
+
+
+def _select(wallet: WalletResponse, selected: List[str]) -> SelectedWallet:
+    content = asdict(wallet)
+    return SelectedWallet(**{name: content[name] for name in selected})
 
-@wallets_api.post("/wallets", responses={201: {}, 400: {}, 403: {}, 404: {}})
+
+@wallets_api.post(
+    "/wallets",
+    responses={201: {}, 400: {}, 403: {}, 404: {}},
+    response_model=SelectedWallet,
+    response_model_exclude_unset=True,
+)
 def create_wallet(
     response: Response,
     api_key: str | None = Header(None),
+    wallet_fields: str | None = Query(None, alias="fields"),
     core: BitcoinWalletCore = Depends(get_core),
-) -> WalletResponse:
-    core_response = core.create_wallet(api_key)
+) -> SelectedWallet:
+    selected = _parse_fields(wallet_fields)
+    core_response = core.create_wallet(api_key, not USD_FIELDS.isdisjoint(selected))
     if core_response.status != CoreStatus.SUCCESSFUL_POST:
         raise HTTPException(to_http[core_response.status], detail=core_response.message)
     response.status_code = to_http[core_response.status]
-    return core_response.response_content
+    return _select(core_response.response_content, selected)
+
+
+@wallets_api.get(
+    "/wallets",
+    responses={200: {}, 400: {}, 403: {}, 404: {}},
+    response_model=SelectedWallets,
+    response_model_exclude_unset=True,
+)
+def get_wallets(
+    response: Response,
+    api_key: str | None = Header(None),
+    wallet_fields: str | None = Query(None, alias="fields"),
+    core: BitcoinWalletCore = Depends(get_core),
+) -> SelectedWallets:
+    selected = _parse_fields(wallet_fields)
+    core_response = core.get_wallets(api_key, not USD_FIELDS.isdisjoint(selected))
+    if core_response.status != CoreStatus.SUCCESSFUL_GET:
+        raise HTTPException(to_http[core_response.status], detail=core_response.message)
+    response.status_code = to_http[core_response.status]
+    return SelectedWallets(
+        wallets=[
+            _select(wallet, selected)
+            for wallet in core_response.response_content.wallets
+        ]
+    )
 
 
-@wallets_api.get("/wallets/{address}", responses={200: {}, 400: {}, 403: {}, 404: {}})
+@wallets_api.get(
+    "/wallets/{address}",
+    responses={200: {}, 400: {}, 403: {}, 404: {}},
+    response_model=SelectedWallet,
+    response_model_exclude_unset=True,
+)
 def get_wallet_balance(
     response: Response,
     address: str,
     api_key: str | None = Header(None),
+    wallet_fields: str | None = Query(None, alias="fields"),
     core: BitcoinWalletCore = Depends(get_core),
-) -> WalletResponse:
-    core_response = core.get_wallet_balance(api_key, address)
+) -> SelectedWallet:
+    selected = _parse_fields(wallet_fields)
+    core_response = core.get_wallet_balance(
+        api_key, address, not USD_FIELDS.isdisjoint(selected)
+    )
     if core_response.status != CoreStatus.SUCCESSFUL_GET:
         raise HTTPException(to_http[core_response.status], detail=core_response.message)
     response.status_code = to_http[core_response.status]
-    return core_response.response_content
+    return _select(core_response.response_content, selected)
@@ -0,0 +1,72 @@
+from sqlite3 import Connection
+from typing import List
+
+# append only, the position of a script is the schema version it produces
+MIGRATIONS: List[str] = [
+    # 1: the schema the repositories used to create on every start
+    """CREATE TABLE IF NOT EXISTS users
+        (user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT NOT NULL UNIQUE,
+        api_key TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS wallets
+        (wallet_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        address TEXT NOT NULL UNIQUE,
+        balance BIGINT NOT NULL,
+        user_id INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users(user_id));
+    CREATE TABLE IF NOT EXISTS transactions
+        (transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_id INTEGER,
+        to_id INTEGER,
+        amount BIGINT,
+        commission BIGINT,
+        FOREIGN KEY (from_id) REFERENCES wallets(wallet_id),
+        FOREIGN KEY (to_id) REFERENCES wallets(wallet_id));
+    CREATE TABLE IF NOT EXISTS rate_history
+        (rate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_currency TEXT NOT NULL,
+        to_currency TEXT NOT NULL,
+        rate TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        recorded_at REAL NOT NULL);
+    CREATE INDEX IF NOT EXISTS rate_history_pair_time
+        ON rate_history (from_currency, to_currency, recorded_at);""",
+    # 2: ownership checks and history reads
+    """CREATE INDEX IF NOT EXISTS wallets_user_id ON wallets (user_id);
+    CREATE INDEX IF NOT EXISTS transactions_from_id ON transactions (from_id);
+    CREATE INDEX IF NOT EXISTS transactions_to_id ON transactions (to_id);""",
+    # 3: platform totals kept up to date by every ledger insert
+    """CREATE TABLE IF NOT EXISTS statistics
+        (statistics_id INTEGER PRIMARY KEY CHECK (statistics_id = 1),
+        transaction_count BIGINT NOT NULL,
+        total_commission BIGINT NOT NULL);
+    INSERT OR IGNORE INTO statistics
+        SELECT 1, count(*), coalesce(sum(commission), 0) FROM transactions;""",
+    # 4: timestamps and per bucket totals, older rows stay out of the rollups
+    """ALTER TABLE transactions ADD COLUMN created_at REAL;
+    CREATE TABLE IF NOT EXISTS statistics_rollups
+        (bucket TEXT NOT NULL,
+        bucket_start INTEGER NOT NULL,
+        transaction_count BIGINT NOT NULL,
+        volume BIGINT NOT NULL,
+        total_commission BIGINT NOT NULL,
+        PRIMARY KEY (bucket, bucket_start)) WITHOUT ROWID;""",
+]
+
+
+def schema_version(connection: Connection) -> int:
+    version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+    return version
+
+
+def migrate(connection: Connection) -> int:
+    version = schema_version(connection)
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            connection.executescript(
+                f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;"
+            )
+        except Exception:
+            connection.rollback()
+            raise
+    return len(MIGRATIONS)
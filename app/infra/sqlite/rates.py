@@ -0,0 +1,47 @@
+from decimal import Decimal
+from sqlite3 import Connection
+from typing import Optional
+
+from app.core.interactors.conversion import Currency
+from app.core.interactors.polling import RateSnapshot
+from app.infra.sqlite.writes import write_transaction
+
+
+class RateHistorySqlRepository:
+    connection: Connection
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+    def record_rate(
+        self, from_currency: Currency, to_currency: Currency, snapshot: RateSnapshot
+    ) -> bool:
+        with write_transaction(self.connection) as cursor:
+            cursor.execute(
+                """INSERT INTO rate_history
+                (from_currency, to_currency, rate, provider, recorded_at)
+                VALUES (?, ?, ?, ?, ?)""",
+                (
+                    from_currency.name,
+                    to_currency.name,
+                    str(snapshot.rate),
+                    snapshot.provider,
+                    snapshot.fetched_at,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def get_rate_at(
+        self, from_currency: Currency, to_currency: Currency, timestamp: float
+    ) -> Optional[RateSnapshot]:
+        # a single descending seek on the (pair, recorded_at) index
+        row = self.connection.execute(
+            """SELECT rate, provider, recorded_at FROM rate_history
+            WHERE from_currency = ? AND to_currency = ? AND recorded_at <= ?
+            ORDER BY recorded_at DESC
+            LIMIT 1""",
+            (from_currency.name, to_currency.name, timestamp),
+        ).fetchone()
+        if row is None:
+            return None
+        return RateSnapshot(Decimal(row[0]), row[1], row[2])
@@ -1,70 +1,225 @@
 from sqlite3 import Connection, Cursor
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 
+from app.core.models.req.statistics import BUCKET_SECONDS, StatisticsBucket
 from app.core.models.resp.transaction import TransactionResponse
+from app.infra.sqlite.writes import Rollback, write_transaction
 
 
 class TransactionSqlRepository:
     connection: Connection
-    _cursor: Cursor
 
     def __init__(self, connection: Connection) -> None:
         self.connection = connection
-        self._cursor = connection.cursor()
-        self._cursor.execute(
-            """CREATE TABLE IF NOT EXISTS transactions
-                (transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_id INTEGER,
-                to_id INTEGER,
-                amount BIGINT,
-                commission BIGINT,
-                FOREIGN KEY (from_id) REFERENCES wallets(wallet_id),
-                FOREIGN KEY (to_id) REFERENCES wallets(wallet_id))"""
-        )
 
     def check_transaction_validity(self, from_id: int, to_id: int) -> bool:
-        self._cursor.execute(
+        cursor = self.connection.execute(
             "SELECT * FROM wallets WHERE wallet_address = ? OR wallet_address = ?",
             (from_id, to_id),
         )
-        return self._cursor.rowcount == 2
+        return cursor.rowcount == 2
 
     def create_transaction(
-        self, from_id: int, to_id: int, amount: int, commission_satoshi: int
+        self,
+        from_id: int,
+        to_id: int,
+        amount: int,
+        commission_satoshi: int,
+        created_at: float,
     ) -> bool:
-        self._cursor.execute(
-            """INSERT INTO transactions (from_id, to_id, amount, commission)
-            VALUES (?, ?, ?, ?)""",
-            (from_id, to_id, amount, commission_satoshi),
-        )
-        self.connection.commit()
-        return self._cursor.rowcount == 1
+        inserted = False
+        with write_transaction(self.connection) as cursor:
+            cursor.execute(
+                """INSERT INTO transactions
+                (from_id, to_id, amount, commission, created_at)
+                VALUES (?, ?, ?, ?, ?)""",
+                (from_id, to_id, amount, commission_satoshi, created_at),
+            )
+            inserted = cursor.rowcount == 1
+            self._count_transaction(cursor, amount, commission_satoshi, created_at)
+        return inserted
+
+    def transfer(
+        self,
+        from_id: int,
+        to_id: int,
+        amount: int,
+        commission_satoshi: int,
+        created_at: float,
+    ) -> bool:
+        # debit, credit and ledger entry commit together or not at all
+        transferred = False
+        with write_transaction(self.connection) as cursor:
+            cursor.execute(
+                """UPDATE wallets
+                   SET balance = balance - ?
+                   WHERE wallet_id = ? AND balance >= ?""",
+                (amount + commission_satoshi, from_id, amount + commission_satoshi),
+            )
+            if cursor.rowcount != 1:
+                raise Rollback
+            cursor.execute(
+                "UPDATE wallets SET balance = balance + ? WHERE wallet_id = ?",
+                (amount, to_id),
+            )
+            if cursor.rowcount != 1:
+                raise Rollback
+            cursor.execute(
+                """INSERT INTO transactions
+                (from_id, to_id, amount, commission, created_at)
+                VALUES (?, ?, ?, ?, ?)""",
+                (from_id, to_id, amount, commission_satoshi, created_at),
+            )
+            self._count_transaction(cursor, amount, commission_satoshi, created_at)
+            transferred = True
+        return transferred
 
     def get_transactions(self, wallet_ids: List[int]) -> List[TransactionResponse]:
-        # wallet_tuples = [wallet_ids[i] for i in range(len(wallet_ids))]
-        # wallet_tuples = (1, 2, 3)
-        # self._cursor.execute(
-        #     "SELECT * FROM transactions WHERE from_id in ?", (wallet_ids,)
-        # )
-        query = """SELECT w1.address, w2.address, t.amount
-                FROM transactions t
+        # one index probe per side, OR across two columns would scan the table
+        placeholders = ",".join("?" for _ in wallet_ids)
+        query = f"""SELECT w1.address, w2.address, t.amount
+                FROM (
+                    SELECT transaction_id, from_id, to_id, amount
+                    FROM transactions WHERE from_id IN ({placeholders})
+                    UNION ALL
+                    SELECT transaction_id, from_id, to_id, amount
+                    FROM transactions
+                    WHERE to_id IN ({placeholders})
+                    AND from_id NOT IN ({placeholders})
+                ) t
                 INNER JOIN wallets w1 ON t.from_id == w1.wallet_id
                 INNER JOIN wallets w2 ON t.to_id == w2.wallet_id
-                WHERE t.from_id in ({}) OR t.to_id in ({})""".format(
-            ",".join("?" for x in wallet_ids), ",".join("?" for x in wallet_ids)
-        )
-        self._cursor.execute(query, wallet_ids + wallet_ids)
-        rows = self._cursor.fetchall()
+                ORDER BY t.transaction_id"""
+        rows = self.connection.execute(query, wallet_ids * 3).fetchall()
         answer: List[TransactionResponse] = [
             TransactionResponse(row[0], row[1], row[2]) for row in rows
         ]
         return answer
 
+    def get_transactions_page(
+        self, wallet_ids: List[int], limit: int, before_id: Optional[int]
+    ) -> List[Tuple[int, TransactionResponse]]:
+        return self._select_page(
+            self.connection.cursor(), wallet_ids, limit, before_id, True
+        )
+
+    def iter_transactions(
+        self, wallet_ids: List[int], batch_size: int
+    ) -> Iterator[TransactionResponse]:
+        # oldest first in keyset batches, nothing is sorted or held beyond a batch
+        cursor = self.connection.cursor()
+        after_id = 0
+        while True:
+            batch = self._select_page(cursor, wallet_ids, batch_size, after_id, False)
+            for _, transaction in batch:
+                yield transaction
+            if len(batch) < batch_size:
+                return
+            after_id = batch[-1][0]
+
+    @staticmethod
+    def _select_page(
+        cursor: Cursor,
+        wallet_ids: List[int],
+        limit: int,
+        boundary_id: Optional[int],
+        newest_first: bool,
+    ) -> List[Tuple[int, TransactionResponse]]:
+        # every branch is a bounded seek on one index key
+        # so a page costs the same however deep the client is
+        order, comparison = ("DESC", "<") if newest_first else ("ASC", ">")
+        boundary = "" if boundary_id is None else f"AND transaction_id {comparison} ?"
+        branch = f"""SELECT transaction_id FROM (
+                SELECT transaction_id FROM transactions
+                WHERE {{column}} = ? {boundary}
+                ORDER BY transaction_id {order} LIMIT ?)"""
+        branches: List[str] = []
+        params: List[int] = []
+        for column in ("from_id", "to_id"):
+            for wallet_id in wallet_ids:
+                branches.append(branch.format(column=column))
+                params += (
+                    [wallet_id] if boundary_id is None else [wallet_id, boundary_id]
+                )
+                params.append(limit)
+        if not branches:
+            return []
+
+        cursor.execute(
+            f"""SELECT t.transaction_id, w1.address, w2.address, t.amount
+                FROM transactions t
+                INNER JOIN wallets w1 ON t.from_id == w1.wallet_id
+                INNER JOIN wallets w2 ON t.to_id == w2.wallet_id
+                WHERE t.transaction_id IN ({" UNION ".join(branches)})
+                ORDER BY t.transaction_id {order} LIMIT ?""",
+            params + [limit],
+        )
+        return [
+            (row[0], TransactionResponse(row[1], row[2], row[3]))
+            for row in cursor.fetchall()
+        ]
+
     def get_statistics(self) -> Tuple[int, int]:
-        self._cursor.execute("SELECT count(*), sum(commission) FROM transactions")
-        row = self._cursor.fetchone()
-        if row[0] == 0:
+        row = self.connection.execute("""SELECT transaction_count, total_commission
+            FROM statistics WHERE statistics_id = 1""").fetchone()
+        if row is None:
             return 0, 0
         total_count: int = row[0]
         total_profit: int = row[1]
         return total_count, total_profit
+
+    def get_statistics_rollups(
+        self, bucket: StatisticsBucket, start: int, end: int
+    ) -> List[Tuple[int, int, int, int]]:
+        cursor = self.connection.execute(
+            """SELECT bucket_start, transaction_count, volume, total_commission
+            FROM statistics_rollups
+            WHERE bucket = ? AND bucket_start >= ? AND bucket_start < ?
+            ORDER BY bucket_start""",
+            (bucket.value, start, end),
+        )
+        return [(row[0], row[1], row[2], row[3]) for row in cursor.fetchall()]
+
+    def rebuild_statistics(self) -> Tuple[int, int]:
+        # recount from the ledger, the counters are only a cache of it
+        with write_transaction(self.connection) as cursor:
+            cursor.execute("""INSERT OR REPLACE INTO statistics
+                SELECT 1, count(*), coalesce(sum(commission), 0) FROM transactions""")
+            cursor.execute("DELETE FROM statistics_rollups")
+            for bucket, seconds in BUCKET_SECONDS.items():
+                cursor.execute(
+                    """INSERT INTO statistics_rollups
+                    SELECT ?, CAST(created_at / ? AS INTEGER) * ? AS bucket_start,
+                    count(*), sum(amount), sum(commission)
+                    FROM transactions WHERE created_at IS NOT NULL
+                    GROUP BY bucket_start""",
+                    (bucket.value, seconds, seconds),
+                )
+        return self.get_statistics()
+
+    @staticmethod
+    def _count_transaction(
+        cursor: Cursor, amount: int, commission_satoshi: int, created_at: float
+    ) -> None:
+        # runs inside the caller's transaction, committed with the ledger row
+        cursor.execute(
+            """UPDATE statistics
+            SET transaction_count = transaction_count + 1,
+            total_commission = total_commission + ?
+            WHERE statistics_id = 1""",
+            (commission_satoshi,),
+        )
+        for bucket, seconds in BUCKET_SECONDS.items():
+            cursor.execute(
+                """INSERT INTO statistics_rollups VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (bucket, bucket_start) DO UPDATE SET
+                transaction_count = transaction_count + 1,
+                volume = volume + excluded.volume,
+                total_commission = total_commission + excluded.total_commission""",
+                (
+                    bucket.value,
+                    int(created_at // seconds) * seconds,
+                    amount,
+                    commission_satoshi,
+                ),
+            )
@@ -1,45 +1,58 @@
-from sqlite3 import Connection, Cursor
+from sqlite3 import Connection
+from typing import Optional
+
+from app.core.interactors.users import Principal
+from app.infra.sqlite.writes import write_transaction
 
 
 class UsersSqlRepository:
     connection: Connection
-    _cursor: Cursor
 
     def __init__(self, connection: Connection) -> None:
         self.connection = connection
-        self._cursor = connection.cursor()
-        self._cursor.execute(
-            """CREATE TABLE IF NOT EXISTS users
-                (user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT NOT NULL UNIQUE,
-                api_key TEXT NOT NULL UNIQUE)"""
-        )
 
     def create_user(self, email: str, api_key: str) -> bool:
-        self._cursor.execute(
-            "INSERT INTO users (email, api_key) VALUES (?, ?)",
-            (email, api_key),
-        )
-        self.connection.commit()
-        return self._cursor.rowcount == 1
+        with write_transaction(self.connection) as cursor:
+            cursor.execute(
+                "INSERT INTO users (email, api_key) VALUES (?, ?)",
+                (email, api_key),
+            )
+        return cursor.rowcount == 1
 
     def user_exists_with_email(self, email: str) -> bool:
-        self._cursor.execute(
+        row = self.connection.execute(
             "SELECT user_id FROM users where email = ?",
             (email,),
-        )
-        row = self._cursor.fetchone()
+        ).fetchone()
         if row is None:
             return False
         return True
 
     def get_user_id(self, api_key: str) -> int:
-        self._cursor.execute(
+        row = self.connection.execute(
             "SELECT user_id FROM users where api_key = ?",
             (api_key,),
-        )
-        row = self._cursor.fetchone()
+        ).fetchone()
         if row is None:
             return -1
         user_id: int = row[0]
         return user_id
+
+    def get_principal(self, api_key: str) -> Optional[Principal]:
+        # one round trip for the user and every wallet it owns
+        rows = self.connection.execute(
+            """SELECT users.user_id, wallets.address, wallets.wallet_id
+                FROM users LEFT JOIN wallets ON wallets.user_id = users.user_id
+                WHERE users.api_key = ?""",
+            (api_key,),
+        ).fetchall()
+        if not rows:
+            return None
+        return Principal(
+            user_id=rows[0][0],
+            wallets={
+                address: wallet_id
+                for _, address, wallet_id in rows
+                if address is not None
+            },
+        )
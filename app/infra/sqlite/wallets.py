@@ -1,74 +1,111 @@
-from sqlite3 import Connection, Cursor, IntegrityError
-from typing import List
+from sqlite3 import Connection, IntegrityError
+from typing import Dict, List, Optional, Tuple
+
+from app.core.interactors.wallets import WalletCreation, WalletRef
+from app.infra.sqlite.writes import write_transaction
 
 
 class WalletsSqlRepository:
     connection: Connection
-    _cursor: Cursor
 
     def __init__(self, connection: Connection) -> None:
         self.connection = connection
-        self._cursor = connection.cursor()
-        self._cursor.execute(
-            """CREATE TABLE IF NOT EXISTS wallets
-                (wallet_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                address TEXT NOT NULL UNIQUE,
-                balance BIGINT NOT NULL,
-                user_id INTEGER,
-                FOREIGN KEY (user_id) REFERENCES users(user_id))"""
-        )
 
     def create_wallet(self, user_id: int, address: str, init_balance: int) -> bool:
         try:
-            self._cursor.execute(
-                "INSERT INTO wallets (balance, address, user_id) VALUES (?, ?, ?)",
-                (init_balance, address, user_id),
-            )
+            with write_transaction(self.connection) as cursor:
+                cursor.execute(
+                    "INSERT INTO wallets (balance, address, user_id) VALUES (?, ?, ?)",
+                    (init_balance, address, user_id),
+                )
         except IntegrityError:
             return False
-        self.connection.commit()
-        return self._cursor.rowcount == 1
+        return cursor.rowcount == 1
+
+    def create_wallet_within_limit(
+        self, user_id: int, address: str, init_balance: int, limit: int
+    ) -> WalletCreation:
+        # the count and the insert are one statement, parallel creates can't overshoot
+        try:
+            with write_transaction(self.connection) as cursor:
+                row = cursor.execute(
+                    """INSERT INTO wallets (balance, address, user_id)
+                       SELECT ?, ?, ?
+                       WHERE (SELECT count(*) FROM wallets WHERE user_id = ?) < ?
+                       RETURNING wallet_id""",
+                    (init_balance, address, user_id, user_id, limit),
+                ).fetchone()
+        except IntegrityError:
+            # address already taken
+            return WalletCreation(wallet=None)
+        if row is None:
+            return WalletCreation(wallet=None, limit_reached=True)
+        return WalletCreation(wallet=WalletRef(wallet_id=row[0], user_id=user_id))
 
     def get_wallet_id(self, address: str) -> int:
-        self._cursor.execute(
+        row = self.connection.execute(
             "SELECT wallet_id FROM wallets where address = ?",
             (address,),
-        )
-        row = self._cursor.fetchone()
+        ).fetchone()
         if row is None:
             return -1
         wallet_id: int = row[0]
         return wallet_id
 
     def get_user_wallets(self, user_id: int) -> List[int]:
-        self._cursor.execute(
+        ids = self.connection.execute(
             "SELECT wallet_id FROM wallets where user_id = ?",
             (user_id,),
-        )
-        ids = self._cursor.fetchall()
+        ).fetchall()
         return list(sum(ids, ()))
 
+    def get_user_wallet_balances(self, user_id: int) -> List[Tuple[str, int]]:
+        rows = self.connection.execute(
+            """SELECT address, balance FROM wallets
+               WHERE user_id = ? ORDER BY wallet_id""",
+            (user_id,),
+        ).fetchall()
+        return [(address, balance) for address, balance in rows]
+
     def check_wallet_validity(self, wallet_address: str) -> int:
         return self.get_wallet_id(address=wallet_address)
 
     def get_wallet_balance(self, address: str) -> int:
-        self._cursor.execute(
+        row = self.connection.execute(
             "SELECT balance FROM wallets where address = ?",
             (address,),
-        )
-        row = self._cursor.fetchone()
+        ).fetchone()
         if row is None:
             return -1
         satoshi_balance: int = row[0]
         return satoshi_balance
 
     def set_balance(self, address: str, amount: int) -> bool:
-        self._cursor.execute(
-            """UPDATE wallets
-               SET balance = ?
-               WHERE address = ?""",
-            (amount, address),
-        )
+        with write_transaction(self.connection) as cursor:
+            cursor.execute(
+                """UPDATE wallets
+                   SET balance = ?
+                   WHERE address = ?""",
+                (amount, address),
+            )
+        return cursor.rowcount == 1
+
+    def find_wallet(self, address: str) -> Optional[WalletRef]:
+        row = self.connection.execute(
+            "SELECT wallet_id, user_id FROM wallets where address = ?",
+            (address,),
+        ).fetchone()
+        if row is None:
+            return None
+        return WalletRef(wallet_id=row[0], user_id=row[1])
 
-        row = self._cursor.fetchone()
-        return row is not None
+    def get_recent_wallets(self, limit: int) -> Dict[str, WalletRef]:
+        rows = self.connection.execute(
+            """SELECT address, wallet_id, user_id FROM wallets
+               ORDER BY wallet_id DESC LIMIT ?""",
+            (limit,),
+        ).fetchall()
+        return {
+            address: WalletRef(wallet_id=wallet_id, user_id=user_id)
+            for address, wallet_id, user_id in rows
+        }
@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from sqlite3 import Connection, Cursor
+from threading import Lock
+from typing import Iterator
+
+# repositories share the connection and sqlite transactions belong to it,
+# so writes from different threads must never interleave
+_write_lock = Lock()
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def write_transaction(connection: Connection) -> Iterator[Cursor]:
+    # raising Rollback undoes the writes without surfacing an error
+    with _write_lock:
+        cursor = connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except Rollback:
+            connection.rollback()
+            return
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
@@ -0,0 +1,12 @@
+import sqlite3
+
+from app.infra.sqlite.migrations import migrate
+from app.infra.sqlite.transactions import TransactionSqlRepository
+
+if __name__ == "__main__":
+    connection = sqlite3.connect("database.db")
+    migrate(connection)
+    total_count, total_profit = TransactionSqlRepository(
+        connection
+    ).rebuild_statistics()
+    print(f"transactions: {total_count}, platform profit: {total_profit}")
@@ -1,31 +1,63 @@
 import sqlite3
+from contextlib import asynccontextmanager
 from sqlite3 import Connection
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 
+from app.core.constants.constants import RATE_HEDGE_DELAY_S, WALLET_CACHE_PRELOAD
 from app.core.facade import BitcoinWalletCore
+from app.core.interactors.conversion import SubstitutableHTTPRateService
+from app.core.interactors.health import HealthMonitor
+from app.core.interactors.polling import RatePoller
+from app.infra.cache.users import CachedUsersRepository
+from app.infra.cache.wallets import CachedWalletsRepository
 from app.infra.fastAPI.endpoints.statistics import statistics_api
 from app.infra.fastAPI.endpoints.transactions import transactions_api
 from app.infra.fastAPI.endpoints.users import users_api
 from app.infra.fastAPI.endpoints.wallets import wallets_api
+from app.infra.sqlite.migrations import migrate
+from app.infra.sqlite.rates import RateHistorySqlRepository
 from app.infra.sqlite.transactions import TransactionSqlRepository
 from app.infra.sqlite.users import UsersSqlRepository
 from app.infra.sqlite.wallets import WalletsSqlRepository
 
 
 def setup() -> FastAPI:
-    app = FastAPI()
+    connection: Connection = sqlite3.connect("database.db", check_same_thread=False)
+    migrate(connection)
+    users_repository = CachedUsersRepository(UsersSqlRepository(connection=connection))
+    wallets_repository = CachedWalletsRepository(
+        WalletsSqlRepository(connection=connection),
+        on_wallet_created=users_repository.invalidate_user,
+    )
+    wallets_repository.preload(WALLET_CACHE_PRELOAD)
+    transactions_repository = TransactionSqlRepository(connection=connection)
+    rate_history_repository = RateHistorySqlRepository(connection=connection)
+
+    rate_service = SubstitutableHTTPRateService(hedge_delay_s=RATE_HEDGE_DELAY_S)
+    rate_poller = RatePoller(rate_service=rate_service, history=rate_history_repository)
+    rate_poller.restore()
+    health_monitor = HealthMonitor(check=rate_service.check_health)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        health_monitor.start()
+        rate_poller.start()
+        yield
+        rate_poller.stop()
+        health_monitor.stop()
+
+    app = FastAPI(lifespan=lifespan)
     app.include_router(statistics_api)
     app.include_router(transactions_api)
     app.include_router(users_api)
     app.include_router(wallets_api)
-    connection: Connection = sqlite3.connect("database.db", check_same_thread=False)
-    users_repository = UsersSqlRepository(connection=connection)
-    wallets_repository = WalletsSqlRepository(connection=connection)
-    transactions_repository = TransactionSqlRepository(connection=connection)
     app.state.core = BitcoinWalletCore.create(
         transactions_repository=transactions_repository,
         users_repository=users_repository,
         wallets_repository=wallets_repository,
+        rate_service=rate_poller,
+        rate_freshness=rate_poller,
     )
     return app
@@ -0,0 +1,35 @@
+from decimal import Decimal
+from math import ceil
+from timeit import repeat
+
+from app.core.constants.constants import COMMISSION_BASIS_POINTS, COMMISSION_PERCENT
+from app.core.money import fee, satoshi_to_usd, scale_rate
+
+RATE = Decimal("20000.5")
+AMOUNTS = list(range(1, 2100000000000000, 2100000000000000 // 10000))
+NUMBER = 20
+
+
+def float_path() -> None:
+    for amount in AMOUNTS:
+        (RATE * Decimal(amount / 100000000)).quantize(Decimal("0.01"))
+        int(ceil(amount * COMMISSION_PERCENT / 100))
+
+
+def integer_path() -> None:
+    rate = scale_rate(RATE)
+    for amount in AMOUNTS:
+        satoshi_to_usd(amount, rate)
+        fee(amount, COMMISSION_BASIS_POINTS)
+
+
+if __name__ == "__main__":
+    for name, path in (("float/decimal", float_path), ("integer", integer_path)):
+        seconds = min(repeat(path, number=NUMBER, repeat=5)) / NUMBER / len(AMOUNTS)
+        print(f"{name:>13}: {seconds * 1e9:8.1f} ns per conversion + fee")
+    mismatched = sum(
+        (RATE * Decimal(amount / 100000000)).quantize(Decimal("0.01"))
+        != satoshi_to_usd(amount, scale_rate(RATE))
+        for amount in AMOUNTS
+    )
+    print(f"float path off by a cent on {mismatched} of {len(AMOUNTS)} amounts")
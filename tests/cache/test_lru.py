@@ -0,0 +1,22 @@
+from app.infra.cache.lru import LRUCache
+
+
+def test_least_recently_used_evicted() -> None:
+    cache: LRUCache[str, int] = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_invalidate_where() -> None:
+    cache: LRUCache[str, int] = LRUCache()
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 1)
+    assert cache.invalidate_where(lambda _, value: value == 1) == 2
+    assert len(cache) == 1
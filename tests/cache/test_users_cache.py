@@ -0,0 +1,92 @@
+import sqlite3
+from typing import Callable, Optional
+
+import pytest
+
+from app.core.interactors.users import Principal
+from app.infra.cache.users import CachedUsersRepository
+from app.infra.cache.wallets import CachedWalletsRepository
+from app.infra.sqlite.migrations import migrate
+from app.infra.sqlite.users import UsersSqlRepository
+from app.infra.sqlite.wallets import WalletsSqlRepository
+
+
+class RacingUsersRepository(UsersSqlRepository):
+    # runs during the lookup, after the cache decided to ask the database
+    during_lookup: Callable[[], object] = staticmethod(lambda: None)
+
+    def get_principal(self, api_key: str) -> Optional[Principal]:
+        principal = super().get_principal(api_key)
+        self.during_lookup()
+        return principal
+
+
+@pytest.fixture
+def repository() -> CachedUsersRepository:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    WalletsSqlRepository(connection)
+    repository = CachedUsersRepository(UsersSqlRepository(connection))
+    repository.create_user("test", "test_key")
+    return repository
+
+
+def test_principal_cached(repository: CachedUsersRepository) -> None:
+    assert repository.get_principal("test_key") == Principal(1)
+    assert repository.get_principal("test_key") == Principal(1)
+    assert repository.get_user_id("test_key") == 1
+    assert (repository.principals.hits, repository.principals.misses) == (2, 1)
+
+
+def test_invalid_key_cached(repository: CachedUsersRepository) -> None:
+    for _ in range(3):
+        assert repository.get_user_id("guess") == -1
+        assert repository.get_principal("guess") is None
+    assert (repository.invalid_keys.hits, repository.invalid_keys.misses) == (5, 1)
+
+
+def test_created_user_not_shadowed(repository: CachedUsersRepository) -> None:
+    assert repository.get_principal("new_key") is None
+    repository.create_user("new", "new_key")
+    assert repository.get_principal("new_key") == Principal(2)
+
+
+def test_invalidation(repository: CachedUsersRepository) -> None:
+    repository.get_user_id("test_key")
+    repository.invalidate_user(1)
+    repository.get_user_id("test_key")
+    repository.invalidate("test_key")
+    repository.get_user_id("test_key")
+    assert (repository.principals.hits, repository.principals.misses) == (0, 3)
+
+
+def test_new_wallet_invalidates_principal(repository: CachedUsersRepository) -> None:
+    sql_repository = repository.users_repository
+    assert isinstance(sql_repository, UsersSqlRepository)
+    wallets = CachedWalletsRepository(
+        WalletsSqlRepository(sql_repository.connection),
+        on_wallet_created=repository.invalidate_user,
+    )
+    assert repository.get_principal("test_key") == Principal(1)
+    assert wallets.create_wallet_within_limit(1, "address_1", 100, 3).wallet
+    assert repository.get_principal("test_key") == Principal(1, {"address_1": 1})
+
+
+@pytest.mark.parametrize("owner_id, cached", [(2, True), (1, False)])
+def test_lookup_racing_wallet_creation(owner_id: int, cached: bool) -> None:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    racing = RacingUsersRepository(connection)
+    repository = CachedUsersRepository(racing)
+    wallets = CachedWalletsRepository(
+        WalletsSqlRepository(connection),
+        on_wallet_created=repository.invalidate_user,
+    )
+    repository.create_user("test", "test_key")
+    repository.create_user("other", "other_key")
+    racing.during_lookup = lambda: wallets.create_wallet(owner_id, "address_1", 100)
+
+    repository.get_principal("test_key")
+    racing.during_lookup = lambda: None
+    repository.get_principal("test_key")
+    assert repository.principals.hits == int(cached)
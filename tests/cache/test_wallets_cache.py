@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from app.core.interactors.wallets import WalletRef
+from app.infra.cache.wallets import CachedWalletsRepository
+from app.infra.sqlite.migrations import migrate
+from app.infra.sqlite.users import UsersSqlRepository
+from app.infra.sqlite.wallets import WalletsSqlRepository
+
+
+@pytest.fixture
+def sql_repository() -> WalletsSqlRepository:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    UsersSqlRepository(connection).create_user("test", "test_key")
+    repository = WalletsSqlRepository(connection)
+    repository.create_wallet(1, "address_1", 100)
+    repository.create_wallet(1, "address_2", 100)
+    return repository
+
+
+def test_filled_on_create(sql_repository: WalletsSqlRepository) -> None:
+    repository = CachedWalletsRepository(sql_repository)
+    assert repository.create_wallet(1, "address_3", 100)
+    assert repository.refs.get("address_3") == WalletRef(3, 1)
+    assert not repository.create_wallet(1, "address_3", 100)
+
+
+def test_filled_on_lookup(sql_repository: WalletsSqlRepository) -> None:
+    repository = CachedWalletsRepository(sql_repository)
+    assert repository.get_wallet_id("address_2") == 2
+    assert repository.check_wallet_validity("address_2") == 2
+    assert repository.get_wallet_id("missing") == -1
+    assert repository.get_wallet_id("missing") == -1
+    assert (repository.refs.hits, repository.refs.misses) == (1, 3)
+
+
+def test_preload(sql_repository: WalletsSqlRepository) -> None:
+    repository = CachedWalletsRepository(sql_repository)
+    assert repository.preload(1) == 1
+    assert repository.find_wallet("address_2") == WalletRef(2, 1)
+    assert repository.refs.misses == 0
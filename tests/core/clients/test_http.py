@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+from time import sleep
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.clients.http import (
+    IHTTPClient,
+    PooledRequestsClient,
+    RequestsClientBuilder,
+    SingleFlightClient,
+)
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        status = 503 if self.path == "/down" else 200
+        body = b"[20000.5]"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def base_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TickerHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(base_url: str) -> None:
+    client = RequestsClientBuilder().with_pool_size(1, 2).build_pooled()
+    for _ in range(5):
+        assert client.get(f"{base_url}/ticker") == [20000.5]
+    stats = client.pool_stats()
+    assert len(stats) == 1
+    assert stats[0].requests_sent == 5
+    assert stats[0].connections_opened == 1
+    client.close()
+
+
+def test_pool_bounded_across_threads(base_url: str) -> None:
+    client = PooledRequestsClient(pool_maxsize=4)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(client.get, [f"{base_url}/ticker"] * 40))
+    assert results == [[20000.5]] * 40
+    stats = client.pool_stats()
+    assert stats[0].requests_sent == 40
+    assert stats[0].connections_opened <= 4
+    client.close()
+
+
+def test_error_status_raises(base_url: str) -> None:
+    client = PooledRequestsClient()
+    with pytest.raises(HTTPException):
+        client.get(f"{base_url}/down")
+    client.close()
+
+
+class BlockingClient(IHTTPClient):
+    def __init__(self, response: Dict[str, Any] | List[Any] | None) -> None:
+        self.response = response
+        self.release = Event()
+        self.calls = 0
+
+    def get(self, url: str) -> Dict[str, Any] | List[Any]:
+        self.calls += 1
+        self.release.wait(5)
+        if self.response is None:
+            raise HTTPException(status_code=500, detail="Service Unavailable")
+        return self.response
+
+
+def _wait_for_followers(client: SingleFlightClient, followers: int) -> None:
+    for _ in range(500):
+        if client.coalesced == followers:
+            return
+        sleep(0.01)
+
+
+def test_concurrent_gets_are_coalesced() -> None:
+    inner = BlockingClient([20000.5])
+    client = SingleFlightClient(inner)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(client.get, "ticker") for _ in range(8)]
+        _wait_for_followers(client, 7)
+        inner.release.set()
+        assert [future.result() for future in futures] == [[20000.5]] * 8
+    assert inner.calls == 1
+    assert client.coalesced == 7
+
+
+def test_error_is_shared_with_followers() -> None:
+    inner = BlockingClient(None)
+    client = SingleFlightClient(inner)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(client.get, "ticker") for _ in range(4)]
+        _wait_for_followers(client, 3)
+        inner.release.set()
+        for future in futures:
+            with pytest.raises(HTTPException):
+                future.result()
+    assert inner.calls == 1
+
+
+def test_finished_call_is_not_reused() -> None:
+    inner = BlockingClient([1])
+    inner.release.set()
+    client = SingleFlightClient(inner)
+    client.get("ticker")
+    client.get("ticker")
+    assert inner.calls == 2
@@ -14,6 +14,7 @@ from app.core.models.resp.transaction import (
     GetTransactionsResponse,
     TransactionResponse,
 )
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.transactions import TransactionSqlRepository
 from app.infra.sqlite.users import UsersSqlRepository
 from app.infra.sqlite.wallets import WalletsSqlRepository
@@ -25,6 +26,7 @@ class TestCreateUser:
     @cache
     def core(cls) -> BitcoinWalletCore:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
@@ -52,6 +54,7 @@ class TestCreateWallet:
     @cache
     def core(cls) -> BitcoinWalletCore:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
@@ -95,6 +98,7 @@ class TestCreateTransaction:
     @cache
     def params(cls) -> Tuple[BitcoinWalletCore, List[str], List[str]]:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
@@ -237,6 +241,7 @@ class TestGetWalletBalance:
     @cache
     def params(cls) -> Tuple[BitcoinWalletCore, List[str], List[str]]:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
@@ -470,6 +475,7 @@ class TestGetTransactions:
     @cache
     def params(cls) -> Tuple[BitcoinWalletCore, List[str], List[str]]:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
@@ -701,6 +707,7 @@ class TestGetWalletTransactions:
     @cache
     def params(cls) -> Tuple[BitcoinWalletCore, List[str], List[str]]:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
@@ -845,6 +852,7 @@ class TestGetStatistics:
     @cache
     def params(cls) -> Tuple[BitcoinWalletCore, List[str], List[str]]:
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection=connection)
         wallets_repository = WalletsSqlRepository(connection=connection)
         transactions_repository = TransactionSqlRepository(connection=connection)
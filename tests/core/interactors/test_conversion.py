@@ -0,0 +1,128 @@
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from app.core.clients.http import IHTTPClient
+from app.core.interactors.conversion import (
+    CachingRateService,
+    Currency,
+    IRateService,
+    KrakenFinexRateService,
+)
+from app.core.interactors.wallets import HTTPConverter
+
+
+class CountingRateService(IRateService):
+    def __init__(self, rates: List[Decimal]) -> None:
+        self.rates = rates
+        self.calls = 0
+
+    def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        rate = self.rates[min(self.calls, len(self.rates) - 1)]
+        self.calls += 1
+        return rate
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCachingRateService:
+    @pytest.fixture
+    def clock(self) -> FakeClock:
+        return FakeClock()
+
+    @pytest.fixture
+    def scheduled(self) -> List[Callable[[], None]]:
+        return []
+
+    @pytest.fixture
+    def inner(self) -> CountingRateService:
+        return CountingRateService([Decimal(100), Decimal(200)])
+
+    @pytest.fixture
+    def service(
+        self,
+        inner: CountingRateService,
+        clock: FakeClock,
+        scheduled: List[Callable[[], None]],
+    ) -> CachingRateService:
+        return CachingRateService(
+            rate_service=inner,
+            ttl_s=10,
+            clock=clock,
+            background_strategy=scheduled.append,
+        )
+
+    def test_fresh_rate_served_from_cache(
+        self, service: CachingRateService, inner: CountingRateService
+    ) -> None:
+        assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+        assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+        assert inner.calls == 1
+
+    def test_stale_rate_served_while_refreshing(
+        self,
+        service: CachingRateService,
+        inner: CountingRateService,
+        clock: FakeClock,
+        scheduled: List[Callable[[], None]],
+    ) -> None:
+        service.get_rate(Currency.BITCOIN, Currency.USD)
+        clock.now = 11
+        assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+        assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+        assert len(scheduled) == 1
+
+        scheduled.pop()()
+        assert inner.calls == 2
+        assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(200)
+        assert service.get_rate_age(Currency.BITCOIN, Currency.USD) == 0
+
+    def test_age_reported(self, service: CachingRateService, clock: FakeClock) -> None:
+        assert service.get_rate_age(Currency.BITCOIN, Currency.USD) is None
+        service.get_rate(Currency.BITCOIN, Currency.USD)
+        clock.now = 4
+        assert service.get_rate_age(Currency.BITCOIN, Currency.USD) == 4
+
+
+class RecordingClient(IHTTPClient):
+    def __init__(self, response: Dict[str, Any] | List[Any]) -> None:
+        self.response = response
+        self.urls: List[str] = []
+
+    def get(self, url: str) -> Dict[str, Any] | List[Any]:
+        self.urls.append(url)
+        return self.response
+
+
+def test_kraken_rate_service() -> None:
+    client = RecordingClient({"result": {"XXBTZUSD": {"c": ["20000.5", "1"]}}})
+    service = KrakenFinexRateService(http_client=client)
+    assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal("20000.5")
+    assert client.urls == ["https://api.kraken.com/0/public/Ticker?pair=XBTUSD"]
+
+
+def test_convert_many_fetches_rate_once() -> None:
+    rate_service = CountingRateService([Decimal("20000.5")])
+    converter = HTTPConverter(rate_service)
+    amounts = [0, 1, 50, 100000000, 123456789, 2100000000000000]
+    assert converter.convert_many(amounts) == [
+        (Decimal(amount) / 100000000 * Decimal("20000.5")).quantize(Decimal("0.01"))
+        for amount in amounts
+    ]
+    assert rate_service.calls == 1
+
+
+def test_convert_many_rounds_half_even() -> None:
+    converter = HTTPConverter(CountingRateService([Decimal("1")]))
+    assert converter.convert_many([500000, 1500000, 1500001]) == [
+        Decimal("0.00"),
+        Decimal("0.02"),
+        Decimal("0.02"),
+    ]
@@ -0,0 +1,199 @@
+from decimal import Decimal
+from threading import Event
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.interactors.conversion import (
+    Currency,
+    HedgeStats,
+    IHTTPRateService,
+    SubstitutableHTTPRateService,
+)
+from app.core.interactors.health import BreakerState, CircuitBreaker
+from app.core.interactors.routing import LatencyRouter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeHTTPRateService(IHTTPRateService):
+    def __init__(self, name: str, rate: Decimal | None, online: bool = True) -> None:
+        self.name = name
+        self.rate = rate
+        self.online = online
+        self.calls = 0
+
+    def ping(self) -> bool:
+        return self.online
+
+    def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        self.calls += 1
+        if self.rate is None:
+            raise TimeoutError()
+        return self.rate
+
+
+class TestCircuitBreaker:
+    @pytest.fixture
+    def clock(self) -> FakeClock:
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock: FakeClock) -> CircuitBreaker:
+        return CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=clock)
+
+    def test_opens_after_repeated_failures(self, breaker: CircuitBreaker) -> None:
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request()
+
+    def test_single_half_open_probe(
+        self, breaker: CircuitBreaker, clock: FakeClock
+    ) -> None:
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow_request()
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert not breaker.allow_request()
+
+    def test_failed_probe_reopens(
+        self, breaker: CircuitBreaker, clock: FakeClock
+    ) -> None:
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 10
+        breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request()
+
+    def test_successful_probe_closes(
+        self, breaker: CircuitBreaker, clock: FakeClock
+    ) -> None:
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 10
+        breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == BreakerState.CLOSED
+        assert breaker.allow_request()
+
+
+class TestSubstitutableHTTPRateService:
+    @pytest.fixture
+    def services(self) -> List[FakeHTTPRateService]:
+        return [
+            FakeHTTPRateService("bitfinex", None),
+            FakeHTTPRateService("kraken", Decimal(100)),
+        ]
+
+    @pytest.fixture
+    def rate_service(
+        self, services: List[FakeHTTPRateService]
+    ) -> SubstitutableHTTPRateService:
+        return SubstitutableHTTPRateService(
+            services=list(services),
+            breaker_factory=lambda: CircuitBreaker(failure_threshold=1),
+            router=LatencyRouter(probe_ratio=0),
+        )
+
+    def test_falls_back_and_skips_open_provider(
+        self,
+        rate_service: SubstitutableHTTPRateService,
+        services: List[FakeHTTPRateService],
+    ) -> None:
+        assert rate_service.get_rate_with_provider(Currency.BITCOIN, Currency.USD) == (
+            Decimal(100),
+            "kraken",
+        )
+        assert rate_service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+        assert services[0].calls == 1
+        assert services[1].calls == 2
+
+    def test_all_providers_down(
+        self,
+        rate_service: SubstitutableHTTPRateService,
+        services: List[FakeHTTPRateService],
+    ) -> None:
+        services[1].rate = None
+        with pytest.raises(HTTPException):
+            rate_service.get_rate(Currency.BITCOIN, Currency.USD)
+
+    def test_health_check_updates_breakers(
+        self,
+        rate_service: SubstitutableHTTPRateService,
+        services: List[FakeHTTPRateService],
+    ) -> None:
+        services[1].online = False
+        rate_service.check_health()
+        assert rate_service.breakers["bitfinex"].state == BreakerState.CLOSED
+        assert rate_service.breakers["kraken"].state == BreakerState.OPEN
+
+
+class SlowHTTPRateService(FakeHTTPRateService):
+    def __init__(self, name: str, rate: Decimal, release: Event) -> None:
+        super().__init__(name, rate)
+        self.release = release
+
+    def get_rate(self, from_currency: Currency, to_currency: Currency) -> Decimal:
+        self.release.wait(5)
+        return super().get_rate(from_currency, to_currency)
+
+
+class TestHedgedRequests:
+    def test_fast_primary_does_not_hedge(self) -> None:
+        rate_service = SubstitutableHTTPRateService(
+            services=[
+                FakeHTTPRateService("bitfinex", Decimal(100)),
+                FakeHTTPRateService("kraken", Decimal(101)),
+            ],
+            hedge_delay_s=1,
+            router=LatencyRouter(probe_ratio=0),
+        )
+        assert rate_service.get_rate_with_provider(Currency.BITCOIN, Currency.USD) == (
+            Decimal(100),
+            "bitfinex",
+        )
+        assert rate_service.hedge_stats == HedgeStats(1, 0, {"bitfinex": 1})
+
+    def test_slow_primary_loses_to_hedge(self) -> None:
+        release = Event()
+        rate_service = SubstitutableHTTPRateService(
+            services=[
+                SlowHTTPRateService("bitfinex", Decimal(100), release),
+                FakeHTTPRateService("kraken", Decimal(101)),
+            ],
+            hedge_delay_s=0.01,
+            router=LatencyRouter(probe_ratio=0),
+        )
+        assert rate_service.get_rate_with_provider(Currency.BITCOIN, Currency.USD) == (
+            Decimal(101),
+            "kraken",
+        )
+        release.set()
+        assert rate_service.hedge_stats == HedgeStats(1, 1, {"kraken": 1})
+
+    def test_invalid_rate_is_rejected(self) -> None:
+        rate_service = SubstitutableHTTPRateService(
+            services=[
+                FakeHTTPRateService("bitfinex", Decimal(0)),
+                FakeHTTPRateService("kraken", Decimal(101)),
+            ],
+            hedge_delay_s=1,
+            router=LatencyRouter(probe_ratio=0),
+        )
+        assert rate_service.get_rate_with_provider(Currency.BITCOIN, Currency.USD) == (
+            Decimal(101),
+            "kraken",
+        )
+        assert rate_service.hedge_stats.hedges_fired == 0
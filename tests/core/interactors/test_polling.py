@@ -0,0 +1,129 @@
+from decimal import Decimal
+from sqlite3 import connect
+from typing import List, Tuple
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.interactors.conversion import Currency, IProviderRateService
+from app.core.interactors.polling import RatePoller, RateSnapshot
+from app.infra.sqlite.migrations import migrate
+from app.infra.sqlite.rates import RateHistorySqlRepository
+
+
+class FakeProviderRateService(IProviderRateService):
+    def __init__(self, quotes: List[Tuple[Decimal, str] | None]) -> None:
+        self.quotes = quotes
+
+    def get_rate_with_provider(
+        self, from_currency: Currency, to_currency: Currency
+    ) -> Tuple[Decimal, str]:
+        quote = self.quotes.pop(0)
+        if quote is None:
+            raise HTTPException(status_code=500, detail="Service unavailable")
+        return quote
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_refresh_publishes_snapshot(clock: FakeClock) -> None:
+    poller = RatePoller(
+        rate_service=FakeProviderRateService([(Decimal(100), "bitfinex")]),
+        clock=clock,
+    )
+    assert poller.refresh() == RateSnapshot(Decimal(100), "bitfinex", 1000.0)
+    assert poller.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+
+
+def test_failed_refresh_keeps_previous_snapshot(clock: FakeClock) -> None:
+    poller = RatePoller(
+        rate_service=FakeProviderRateService([(Decimal(100), "kraken"), None]),
+        clock=clock,
+    )
+    poller.refresh()
+    clock.now += 5
+    assert poller.refresh() is None
+    assert poller.snapshot == RateSnapshot(Decimal(100), "kraken", 1000.0)
+
+
+def test_stale_snapshot_fails_fast(clock: FakeClock) -> None:
+    poller = RatePoller(
+        rate_service=FakeProviderRateService([(Decimal(100), "kraken")]),
+        max_staleness_s=60,
+        clock=clock,
+    )
+    poller.refresh()
+    clock.now += 61
+    with pytest.raises(HTTPException) as error:
+        poller.get_rate(Currency.BITCOIN, Currency.USD)
+    assert error.value.status_code == 503
+
+
+def test_no_snapshot_fails_fast(clock: FakeClock) -> None:
+    poller = RatePoller(rate_service=FakeProviderRateService([]), clock=clock)
+    with pytest.raises(HTTPException) as error:
+        poller.get_rate(Currency.BITCOIN, Currency.USD)
+    assert error.value.status_code == 503
+
+
+def test_start_and_stop(clock: FakeClock) -> None:
+    poller = RatePoller(
+        rate_service=FakeProviderRateService([(Decimal(100), "bitfinex")]),
+        interval_s=3600,
+        clock=clock,
+    )
+    poller.start()
+    assert poller.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+    poller.stop()
+
+
+def test_refresh_records_history(clock: FakeClock) -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    history = RateHistorySqlRepository(connection)
+    poller = RatePoller(
+        rate_service=FakeProviderRateService([(Decimal(100), "bitfinex")]),
+        clock=clock,
+        history=history,
+    )
+    poller.refresh()
+    assert history.get_rate_at(
+        Currency.BITCOIN, Currency.USD, clock.now
+    ) == RateSnapshot(Decimal(100), "bitfinex", 1000.0)
+
+
+def test_restore_serves_last_known_good_rate_as_degraded(clock: FakeClock) -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    history = RateHistorySqlRepository(connection)
+    history.record_rate(
+        Currency.BITCOIN, Currency.USD, RateSnapshot(Decimal(90), "kraken", 400.0)
+    )
+    poller = RatePoller(
+        rate_service=FakeProviderRateService([None, (Decimal(100), "bitfinex")]),
+        degraded_after_s=60,
+        clock=clock,
+        history=history,
+    )
+    assert poller.restore() == RateSnapshot(Decimal(90), "kraken", 400.0)
+    assert poller.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(90)
+    assert poller.is_degraded()
+
+    # exchanges still down, keep answering with the persisted rate
+    poller.refresh()
+    assert poller.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(90)
+
+    poller.refresh()
+    assert poller.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(100)
+    assert not poller.is_degraded()
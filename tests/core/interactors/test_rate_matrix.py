@@ -0,0 +1,137 @@
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.clients.http import IHTTPClient
+from app.core.interactors.conversion import Currency
+from app.core.interactors.rate_matrix import (
+    RateMatrixService,
+    bitfinex_tickers_parser,
+)
+
+
+class TickersClient(IHTTPClient):
+    def __init__(self) -> None:
+        self.urls: List[str] = []
+
+    def get(self, url: str) -> Dict[str, Any] | List[Any]:
+        self.urls.append(url)
+        # bid and ask straddle the last price, only LAST_PRICE is the rate
+        return [
+            [
+                "tBTCUSD",
+                19990,
+                1.5,
+                20010,
+                2.0,
+                150,
+                0.0075,
+                20000,
+                812.4,
+                20100,
+                19800,
+            ],
+            [
+                "tBTCEUR",
+                17990,
+                1.5,
+                18010,
+                2.0,
+                -90,
+                -0.005,
+                18000,
+                301.2,
+                18200,
+                17900,
+            ],
+            [
+                "tBTCGBP",
+                15990,
+                1.5,
+                16010,
+                2.0,
+                20.5,
+                0.0013,
+                16000.5,
+                95.7,
+                16100,
+                15900,
+            ],
+        ]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def client() -> TickersClient:
+    return TickersClient()
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def service(client: TickersClient, clock: FakeClock) -> RateMatrixService:
+    return RateMatrixService(
+        currencies=(Currency.USD, Currency.EUR, Currency.GBP),
+        http_client=client,
+        ttl_s=10,
+        clock=clock,
+    )
+
+
+def test_all_pairs_from_one_request(
+    service: RateMatrixService, client: TickersClient
+) -> None:
+    assert service.get_rate(Currency.BITCOIN, Currency.USD) == Decimal(20000)
+    assert service.get_rate(Currency.BITCOIN, Currency.GBP) == Decimal("16000.5")
+    assert service.get_rate(Currency.EUR, Currency.USD) == Decimal(20000) / 18000
+    assert service.get_rate(Currency.USD, Currency.BITCOIN) == 1 / Decimal(20000)
+    assert service.get_rate(Currency.GBP, Currency.GBP) == Decimal(1)
+    assert client.urls == [
+        "https://api-pub.bitfinex.com/v2/tickers?symbols=tBTCUSD,tBTCEUR,tBTCGBP"
+    ]
+
+
+def test_matrix_refetched_after_ttl(
+    service: RateMatrixService, client: TickersClient, clock: FakeClock
+) -> None:
+    service.get_rate(Currency.BITCOIN, Currency.USD)
+    clock.now = 5
+    service.get_rate(Currency.EUR, Currency.GBP)
+    assert len(client.urls) == 1
+    clock.now = 11
+    service.get_rate(Currency.EUR, Currency.GBP)
+    assert len(client.urls) == 2
+
+
+def test_unquoted_currency(service: RateMatrixService) -> None:
+    with pytest.raises(HTTPException):
+        service.get_rate(Currency.BITCOIN, Currency.JPY)
+
+
+def test_tickers_parsed_at_last_price() -> None:
+    row = [
+        "tBTCUSD",
+        67001,
+        5.2,
+        67003,
+        4.8,
+        -520,
+        -0.0077,
+        67002.5,
+        1203.1,
+        68000,
+        66500,
+    ]
+    assert bitfinex_tickers_parser([row]) == {"tBTCUSD": Decimal("67002.5")}
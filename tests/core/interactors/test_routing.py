@@ -0,0 +1,39 @@
+from random import Random
+
+import pytest
+
+from app.core.interactors.routing import LatencyRouter, ProviderScore
+
+
+@pytest.fixture
+def router() -> LatencyRouter:
+    return LatencyRouter(alpha=0.5, probe_ratio=0, error_penalty_s=10)
+
+
+def test_unmeasured_providers_keep_configured_order(router: LatencyRouter) -> None:
+    assert router.rank(["bitfinex", "kraken"]) == ["bitfinex", "kraken"]
+
+
+def test_ewma_update(router: LatencyRouter) -> None:
+    router.record("bitfinex", 0.5, True)
+    router.record("bitfinex", 0.25, False)
+    assert router.scores["bitfinex"] == ProviderScore(0.375, 0.5, 2)
+
+
+def test_fastest_provider_ranked_first(router: LatencyRouter) -> None:
+    router.record("bitfinex", 0.8, True)
+    router.record("kraken", 0.1, True)
+    assert router.rank(["bitfinex", "kraken"]) == ["kraken", "bitfinex"]
+
+
+def test_errors_outweigh_latency(router: LatencyRouter) -> None:
+    router.record("bitfinex", 0.8, True)
+    router.record("kraken", 0.1, False)
+    assert router.rank(["bitfinex", "kraken"]) == ["bitfinex", "kraken"]
+
+
+def test_probe_traffic_reaches_slower_provider() -> None:
+    router = LatencyRouter(probe_ratio=1, rng=Random(0))
+    router.record("bitfinex", 0.8, True)
+    router.record("kraken", 0.1, True)
+    assert router.rank(["bitfinex", "kraken"]) == ["bitfinex", "kraken"]
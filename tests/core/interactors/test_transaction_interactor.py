@@ -1,16 +1,28 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime, timezone
 from functools import cache
 from sqlite3 import connect
 from typing import List, Tuple
 
 import pytest
 
-from app.core.interactors.transactions import TransactionsInteractor
+from app.core.constants.constants import STATISTICS_DEFAULT_BUCKETS
+from app.core.interactors.transactions import (
+    TransactionsInteractor,
+    decode_cursor,
+    encode_cursor,
+)
+from app.core.models.req.statistics import StatisticsBucket
 from app.core.models.resp.core_response import CoreStatus
-from app.core.models.resp.statistics import StatisticsResponse
+from app.core.models.resp.statistics import (
+    StatisticsBucketResponse,
+    StatisticsResponse,
+)
 from app.core.models.resp.transaction import (
     GetTransactionsResponse,
     TransactionResponse,
 )
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.transactions import TransactionSqlRepository
 from app.infra.sqlite.users import UsersSqlRepository
 from app.infra.sqlite.wallets import WalletsSqlRepository
@@ -23,6 +35,7 @@ class TestCreateTransaction:
     def params(cls) -> Tuple[TransactionsInteractor, List[int]]:
         # required for transaction_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test", "test_1_key")
         users_repository.create_user("test_2", "test_2_key")
@@ -55,6 +68,19 @@ class TestCreateTransaction:
         response = interactor.create(from_id, to_id, 1000, 15)
         assert response.status == CoreStatus.SUCCESSFUL_POST
 
+    def test_transfer(self, params: Tuple[TransactionsInteractor, List[int]]) -> None:
+        interactor, wallet_ids = params
+        response = interactor.transfer(wallet_ids[1], wallet_ids[4], 1000, 15)
+        assert response.status == CoreStatus.SUCCESSFUL_POST
+
+    def test_transfer_insufficient_funds(
+        self, params: Tuple[TransactionsInteractor, List[int]]
+    ) -> None:
+        interactor, wallet_ids = params
+        response = interactor.transfer(wallet_ids[2], wallet_ids[5], 100000000, 1)
+        assert response.status == CoreStatus.INSUFFICIENT_FUNDS
+        assert response.message == "insufficient funds"
+
 
 class TestGetWalletTransactions:
     @classmethod
@@ -63,6 +89,7 @@ class TestGetWalletTransactions:
     def params(cls) -> Tuple[TransactionsInteractor, List[int]]:
         # required for transaction_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test", "test_1_key")
         users_repository.create_user("test_2", "test_2_key")
@@ -142,6 +169,7 @@ class TestGetTransactionsStatistics:
     def params(cls) -> Tuple[TransactionsInteractor, List[int]]:
         # required for transaction_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test", "test_1_key")
         users_repository.create_user("test_2", "test_2_key")
@@ -187,3 +215,113 @@ class TestGetTransactionsStatistics:
         response = interactor.get_statistics()
         assert response.response_content == StatisticsResponse(6, 5150)
         assert response.status == CoreStatus.SUCCESSFUL_GET
+
+
+def test_paged_history() -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    UsersSqlRepository(connection).create_user("test", "test_1_key")
+    wallets_repository = WalletsSqlRepository(connection)
+    wallets_repository.create_wallet(1, "1_address_1", 100000000)
+    wallets_repository.create_wallet(1, "1_address_2", 100000000)
+    interactor = TransactionsInteractor(TransactionSqlRepository(connection))
+    for amount in range(1, 6):
+        interactor.create(1, 2, amount, 0)
+
+    pages: List[List[int]] = []
+    cursor = None
+    while True:
+        response = interactor.get([1], limit=2, cursor=cursor)
+        pages.append(
+            [
+                transaction.amount_in_satoshi
+                for transaction in response.response_content.transactions
+            ]
+        )
+        cursor = response.response_content.next_cursor
+        if cursor is None:
+            break
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_invalid_cursor() -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    interactor = TransactionsInteractor(TransactionSqlRepository(connection))
+    response = interactor.get([1], limit=2, cursor="not-a-cursor")
+    assert response.status == CoreStatus.INVALID_REQUEST
+
+
+@pytest.mark.parametrize("payload", ["tx:²", "tx:-1", "tx:0", f"tx:{2**63}"])
+def test_crafted_cursor_rejected(payload: str) -> None:
+    assert decode_cursor(urlsafe_b64encode(payload.encode()).decode()) is None
+    assert decode_cursor(encode_cursor(2**63 - 1)) == 2**63 - 1
+
+
+def test_streamed_history() -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    UsersSqlRepository(connection).create_user("test", "test_1_key")
+    wallets_repository = WalletsSqlRepository(connection)
+    wallets_repository.create_wallet(1, "1_address_1", 100000000)
+    wallets_repository.create_wallet(1, "1_address_2", 100000000)
+    interactor = TransactionsInteractor(TransactionSqlRepository(connection))
+    for amount in range(1, 4):
+        interactor.create(1, 2, amount, 0)
+
+    response = interactor.stream([2])
+    assert response.status == CoreStatus.SUCCESSFUL_GET
+    assert [
+        transaction.amount_in_satoshi for transaction in response.response_content
+    ] == [1, 2, 3]
+
+
+def test_statistics_range() -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    UsersSqlRepository(connection).create_user("test", "test_1_key")
+    wallets_repository = WalletsSqlRepository(connection)
+    wallets_repository.create_wallet(1, "1_address_1", 100000000)
+    wallets_repository.create_wallet(1, "1_address_2", 100000000)
+    now = [7200.0]
+    interactor = TransactionsInteractor(
+        TransactionSqlRepository(connection), clock=lambda: now[0]
+    )
+    interactor.create(1, 2, 1000, 15)
+    now[0] = 7300.0
+    interactor.create(1, 2, 500, 8)
+    now[0] = 14400.0
+    interactor.create(2, 1, 200, 3)
+
+    response = interactor.get_statistics_range(
+        StatisticsBucket.HOUR,
+        datetime(1970, 1, 1, 1, 30),
+        datetime(1970, 1, 1, 4, tzinfo=timezone.utc),
+    )
+    assert response.status == CoreStatus.SUCCESSFUL_GET
+    assert response.response_content.buckets == [
+        StatisticsBucketResponse(datetime(1970, 1, 1, 1, tzinfo=timezone.utc), 0, 0, 0),
+        StatisticsBucketResponse(
+            datetime(1970, 1, 1, 2, tzinfo=timezone.utc), 2, 1500, 23
+        ),
+        StatisticsBucketResponse(datetime(1970, 1, 1, 3, tzinfo=timezone.utc), 0, 0, 0),
+    ]
+
+    response = interactor.get_statistics_range(StatisticsBucket.DAY, None, None)
+    buckets = response.response_content.buckets
+    assert len(buckets) == STATISTICS_DEFAULT_BUCKETS
+    assert buckets[-1].start == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert buckets[-1].num_transaction == 3
+
+    now[0] = 14400.5
+    response = interactor.get_statistics_range(StatisticsBucket.HOUR, None, None)
+    buckets = response.response_content.buckets
+    assert len(buckets) == STATISTICS_DEFAULT_BUCKETS
+    assert buckets[-1] == StatisticsBucketResponse(
+        datetime(1970, 1, 1, 4, tzinfo=timezone.utc), 1, 200, 3
+    )
+
+    response = interactor.get_statistics_range(
+        StatisticsBucket.HOUR, datetime(1971, 1, 1), datetime(1970, 1, 1)
+    )
+    assert response.status == CoreStatus.INVALID_REQUEST
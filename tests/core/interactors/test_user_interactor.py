@@ -8,6 +8,7 @@ from app.core.interactors.users import UserInteractor
 from app.core.models.req.user import CreateUserRequest
 from app.core.models.resp.core_response import CoreStatus
 from app.core.models.resp.user import CreateUserResponse
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.users import UsersSqlRepository
 
 key_generation_strategy: Callable[[str], str] = lambda s: s + "_key"
@@ -18,7 +19,9 @@ class TestCreateUser:
     @pytest.fixture
     @cache
     def interactor(cls) -> UserInteractor:
-        repository = UsersSqlRepository(connect(":memory:", check_same_thread=False))
+        connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
+        repository = UsersSqlRepository(connection)
         repository.create_user("test", "test_key")
         return UserInteractor(
             user_repository=repository,
@@ -45,7 +48,9 @@ class TestGetUserId:
     @pytest.fixture
     @cache
     def interactor(cls) -> UserInteractor:
-        repository = UsersSqlRepository(connect(":memory:", check_same_thread=False))
+        connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
+        repository = UsersSqlRepository(connection)
         repository.create_user("test", "test_key")
         return UserInteractor(
             user_repository=repository,
@@ -1,13 +1,20 @@
 from decimal import Decimal
 from functools import cache
 from sqlite3 import connect
+from typing import List, Sequence
+from unittest.mock import MagicMock
 
 import pytest
 
 from app.core.constants.constants import WALLET_LIMIT_PER_USER
 from app.core.interactors.wallets import BitcoinToUsdConverter, WalletsInteractor
 from app.core.models.resp.core_response import CoreResponse, CoreStatus
-from app.core.models.resp.wallet import BadWalletResponse, WalletResponse
+from app.core.models.resp.wallet import (
+    BadWalletResponse,
+    GetWalletsResponse,
+    WalletResponse,
+)
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.users import UsersSqlRepository
 from app.infra.sqlite.wallets import WalletsSqlRepository
 
@@ -16,6 +23,12 @@ class MockConverter(BitcoinToUsdConverter):
     def convert_to_usd(self, bitcoin: Decimal) -> Decimal:
         return bitcoin + 1
 
+    def convert_many(self, satoshi_amounts: Sequence[int]) -> List[Decimal]:
+        return [Decimal(amount) / 100000000 + 1 for amount in satoshi_amounts]
+
+    def rate_is_degraded(self) -> bool:
+        return False
+
 
 class TestCreateWallet:
     @classmethod
@@ -24,6 +37,7 @@ class TestCreateWallet:
     def interactor(cls) -> WalletsInteractor:
         # required for wallets_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test", "test_1_key")
         users_repository.create_user("test_2", "test_2_key")
@@ -76,6 +90,7 @@ class TestGetWalletId:
     def interactor(cls) -> WalletsInteractor:
         # required for wallets_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test_1", "test_1_key")
 
@@ -113,6 +128,7 @@ class TestGetUserWallets:
     def interactor(cls) -> WalletsInteractor:
         # required for wallets_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test_1", "test_1_key")
         users_repository.create_user("test_2", "test_2_key")
@@ -152,6 +168,7 @@ class TestCheckWalletValidity:
     def interactor(cls) -> WalletsInteractor:
         # required for wallets_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test_1", "test_1_key")
 
@@ -188,6 +205,7 @@ class TestGetWalletBalance:
     def interactor(cls) -> WalletsInteractor:
         # required for wallets_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test_1", "test_1_key")
 
@@ -209,6 +227,21 @@ class TestGetWalletBalance:
             message=f"successfully retrieved balance for address: {address}",
         )
 
+    def test_satoshi_only_skips_conversion(self) -> None:
+        connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
+        UsersSqlRepository(connection).create_user("test_1", "test_1_key")
+        wallets_repository = WalletsSqlRepository(connection)
+        wallets_repository.create_wallet(1, "1_address_1", 100000000)
+        converter = MagicMock()
+        interactor = WalletsInteractor(wallets_repository, converter)
+
+        response = interactor.get_wallet_balance("1_address_1", include_usd=False)
+        assert response.response_content == WalletResponse(
+            "1_address_1", 100000000, None
+        )
+        converter.convert_many.assert_not_called()
+
     def test_should_fail_invalid_request(self, interactor: WalletsInteractor) -> None:
         address = "1_address_2"
         response = interactor.get_wallet_balance(address)
@@ -226,6 +259,7 @@ class TestCheckOwnership:
     def interactor(cls) -> WalletsInteractor:
         # required for wallets_repository to be created
         connection = connect(":memory:", check_same_thread=False)
+        migrate(connection)
         users_repository = UsersSqlRepository(connection)
         users_repository.create_user("test_1", "test_1_key")
 
@@ -255,3 +289,34 @@ class TestCheckOwnership:
             status=CoreStatus.WALLET_DOESNT_BELONG_TO_USER,
             message="Wallet does not belong to user",
         )
+
+
+def test_get_user_wallet_balances() -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    UsersSqlRepository(connection).create_user("test_1", "test_1_key")
+    wallets_repository = WalletsSqlRepository(connection)
+    wallets_repository.create_wallet(1, "1_address_1", 100000000)
+    wallets_repository.create_wallet(1, "1_address_2", 50000000)
+    interactor = WalletsInteractor(wallets_repository, MockConverter())
+
+    response = interactor.get_user_wallet_balances(1)
+    assert response.status == CoreStatus.SUCCESSFUL_GET
+    assert response.response_content == GetWalletsResponse(
+        [
+            WalletResponse("1_address_1", 100000000, Decimal(2)),
+            WalletResponse("1_address_2", 50000000, Decimal("1.5")),
+        ]
+    )
+
+
+def test_no_wallets_skip_conversion() -> None:
+    connection = connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    UsersSqlRepository(connection).create_user("test_1", "test_1_key")
+    converter = MagicMock()
+    interactor = WalletsInteractor(WalletsSqlRepository(connection), converter)
+
+    response = interactor.get_user_wallet_balances(1)
+    assert response.response_content == GetWalletsResponse([])
+    converter.convert_many.assert_not_called()
@@ -0,0 +1,41 @@
+from decimal import Decimal
+from math import ceil
+
+from app.core.money import (
+    bitcoin_to_satoshi,
+    divide_half_even,
+    fee,
+    satoshi_to_bitcoin,
+    satoshi_to_usd,
+    scale_rate,
+)
+
+
+def test_divide_half_even() -> None:
+    assert [divide_half_even(n, 10) for n in (14, 15, 16, 25, 35, -15)] == [
+        1,
+        2,
+        2,
+        2,
+        4,
+        -2,
+    ]
+
+
+def test_fee_rounds_up() -> None:
+    assert fee(1000, 150) == 15
+    assert fee(1001, 150) == 16
+    assert fee(0, 150) == 0
+    assert all(fee(amount, 150) == ceil(amount * 1.5 / 100) for amount in range(5000))
+
+
+def test_satoshi_round_trip() -> None:
+    assert satoshi_to_bitcoin(123456789) == Decimal("1.23456789")
+    assert bitcoin_to_satoshi(Decimal("1.23456789")) == 123456789
+
+
+def test_satoshi_to_usd_is_exact() -> None:
+    rate = scale_rate(Decimal("20000.5"))
+    assert satoshi_to_usd(2100000000000000, rate) == Decimal("420010500000.00")
+    assert satoshi_to_usd(1, rate) == Decimal("0.00")
+    assert satoshi_to_usd(123456789, rate) == Decimal("24691.98")
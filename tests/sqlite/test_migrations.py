@@ -0,0 +1,135 @@
+import sqlite3
+from sqlite3 import Connection
+from typing import Callable, List
+
+import pytest
+
+from app.core.models.req.statistics import StatisticsBucket
+from app.infra.sqlite.migrations import MIGRATIONS, migrate, schema_version
+from app.infra.sqlite.transactions import TransactionSqlRepository
+from app.infra.sqlite.users import UsersSqlRepository
+from app.infra.sqlite.wallets import WalletsSqlRepository
+
+
+def test_migrate_is_idempotent() -> None:
+    connection = sqlite3.connect(":memory:")
+    assert schema_version(connection) == 0
+    assert migrate(connection) == len(MIGRATIONS)
+    assert migrate(connection) == len(MIGRATIONS)
+    assert schema_version(connection) == len(MIGRATIONS)
+
+
+def test_legacy_database_upgraded() -> None:
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        """CREATE TABLE users (user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL UNIQUE, api_key TEXT NOT NULL UNIQUE);
+        INSERT INTO users (email, api_key) VALUES ('test', 'test_key');"""
+    )
+    migrate(connection)
+    assert UsersSqlRepository(connection).get_user_id("test_key") == 1
+    indexes = {
+        row[0]
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )
+    }
+    assert {"wallets_user_id", "transactions_from_id", "transactions_to_id"} <= indexes
+
+
+@pytest.fixture
+def connection() -> Connection:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    users = UsersSqlRepository(connection)
+    wallets = WalletsSqlRepository(connection)
+    transactions = TransactionSqlRepository(connection)
+    users.create_user("test", "test_key")
+    wallets.create_wallet(1, "address_1", 1000)
+    wallets.create_wallet(1, "address_2", 1000)
+    transactions.transfer(1, 2, 10, 0, 0)
+    return connection
+
+
+def full_scans(connection: Connection, query: Callable[[], object]) -> List[str]:
+    statements: List[str] = []
+    connection.set_trace_callback(statements.append)
+    query()
+    connection.set_trace_callback(None)
+
+    scans = []
+    for statement in statements:
+        plan = [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}")]
+        # materialized subqueries are scanned by design, tables never should be
+        subqueries = {
+            detail.split()[-1]
+            for detail in plan
+            if detail.startswith(("MATERIALIZE", "CO-ROUTINE"))
+        }
+        scans += [
+            detail
+            for detail in plan
+            if detail.startswith("SCAN ") and detail.split()[1] not in subqueries
+        ]
+    return scans
+
+
+def test_transaction_history_uses_indexes(connection: Connection) -> None:
+    repository = TransactionSqlRepository(connection)
+    assert full_scans(connection, lambda: repository.get_transactions([1, 2])) == []
+
+
+def test_statistics_seeded_from_ledger() -> None:
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(MIGRATIONS[0])
+    connection.executescript(
+        """INSERT INTO transactions (from_id, to_id, amount, commission)
+        VALUES (1, 2, 1000, 15), (2, 1, 500, 8);"""
+    )
+    connection.execute("PRAGMA user_version = 1")
+    migrate(connection)
+    assert TransactionSqlRepository(connection).get_statistics() == (2, 23)
+
+
+def test_statistics_read_without_scan(connection: Connection) -> None:
+    repository = TransactionSqlRepository(connection)
+    assert full_scans(connection, repository.get_statistics) == []
+
+
+def test_statistics_rollups_read_without_scan(connection: Connection) -> None:
+    repository = TransactionSqlRepository(connection)
+    assert (
+        full_scans(
+            connection,
+            lambda: repository.get_statistics_rollups(StatisticsBucket.DAY, 0, 86400),
+        )
+        == []
+    )
+
+
+def test_principal_uses_indexes(connection: Connection) -> None:
+    repository = UsersSqlRepository(connection)
+    assert full_scans(connection, lambda: repository.get_principal("test_key")) == []
+
+
+def test_wallet_lookups_use_indexes(connection: Connection) -> None:
+    repository = WalletsSqlRepository(connection)
+    assert full_scans(connection, lambda: repository.get_user_wallets(1)) == []
+    assert full_scans(connection, lambda: repository.get_user_wallet_balances(1)) == []
+    assert full_scans(connection, lambda: repository.find_wallet("address_1")) == []
+
+
+def test_transaction_page_uses_indexes(connection: Connection) -> None:
+    repository = TransactionSqlRepository(connection)
+    assert (
+        full_scans(connection, lambda: repository.get_transactions_page([1, 2], 10, 5))
+        == []
+    )
+
+
+def test_transaction_export_uses_indexes(connection: Connection) -> None:
+    repository = TransactionSqlRepository(connection)
+    assert (
+        full_scans(connection, lambda: list(repository.iter_transactions([1, 2], 1)))
+        == []
+    )
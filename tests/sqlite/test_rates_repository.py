@@ -0,0 +1,47 @@
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from app.core.interactors.conversion import Currency
+from app.core.interactors.polling import RateSnapshot
+from app.infra.sqlite.migrations import migrate
+from app.infra.sqlite.rates import RateHistorySqlRepository
+
+
+@pytest.fixture
+def repository() -> RateHistorySqlRepository:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    repository = RateHistorySqlRepository(connection)
+    for timestamp, rate in ((100.0, "20000.5"), (200.0, "21000"), (300.0, "19000")):
+        repository.record_rate(
+            Currency.BITCOIN,
+            Currency.USD,
+            RateSnapshot(Decimal(rate), "kraken", timestamp),
+        )
+    return repository
+
+
+def test_rate_in_effect_at_timestamp(repository: RateHistorySqlRepository) -> None:
+    assert repository.get_rate_at(
+        Currency.BITCOIN, Currency.USD, 250.0
+    ) == RateSnapshot(Decimal(21000), "kraken", 200.0)
+    assert repository.get_rate_at(
+        Currency.BITCOIN, Currency.USD, 300.0
+    ) == RateSnapshot(Decimal(19000), "kraken", 300.0)
+
+
+def test_no_rate_before_first_record(repository: RateHistorySqlRepository) -> None:
+    assert repository.get_rate_at(Currency.BITCOIN, Currency.USD, 99.0) is None
+    assert repository.get_rate_at(Currency.BITCOIN, Currency.EUR, 250.0) is None
+
+
+def test_lookup_uses_index(repository: RateHistorySqlRepository) -> None:
+    plan = repository.connection.execute(
+        """EXPLAIN QUERY PLAN SELECT rate, provider, recorded_at FROM rate_history
+        WHERE from_currency = ? AND to_currency = ? AND recorded_at <= ?
+        ORDER BY recorded_at DESC LIMIT 1""",
+        ("BITCOIN", "USD", 250.0),
+    ).fetchall()
+    assert "USING INDEX rate_history_pair_time" in plan[0][3]
@@ -1,8 +1,11 @@
 import sqlite3
 from sqlite3 import Connection
+from threading import Thread
 
 import pytest
 
+from app.core.models.req.statistics import StatisticsBucket
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.transactions import TransactionSqlRepository
 from app.infra.sqlite.users import UsersSqlRepository
 from app.infra.sqlite.wallets import WalletsSqlRepository
@@ -11,6 +14,7 @@ from app.infra.sqlite.wallets import WalletsSqlRepository
 @pytest.fixture
 def connection() -> Connection:
     connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
     users_sql_repository = UsersSqlRepository(connection)
     users_sql_repository.create_user("test", "test_key")
     users_sql_repository.create_user("test1", "test_key1")
@@ -24,10 +28,106 @@ def connection() -> Connection:
 
 def test_create_transaction(connection: Connection) -> None:
     transactions_sql_repository = TransactionSqlRepository(connection)
-    assert transactions_sql_repository.create_transaction(1, 2, 0, 0)
+    assert transactions_sql_repository.create_transaction(1, 2, 0, 0, 0)
 
 
 def test_get_statistics(connection: Connection) -> None:
     transactions_sql_repository = TransactionSqlRepository(connection)
-    assert transactions_sql_repository.create_transaction(1, 2, 1000, 15)
+    assert transactions_sql_repository.create_transaction(1, 2, 1000, 15, 0)
     assert transactions_sql_repository.get_statistics() == (1, 15)
+
+
+def test_transfer(connection: Connection) -> None:
+    wallets_sql_repository = WalletsSqlRepository(connection)
+    wallets_sql_repository.set_balance("random", 1000)
+    transactions_sql_repository = TransactionSqlRepository(connection)
+    assert transactions_sql_repository.transfer(1, 2, 900, 15, 0)
+    assert wallets_sql_repository.get_wallet_balance("random") == 85
+    assert wallets_sql_repository.get_wallet_balance("random1") == 900
+    assert transactions_sql_repository.get_statistics() == (1, 15)
+
+
+def test_transfer_insufficient_funds(connection: Connection) -> None:
+    wallets_sql_repository = WalletsSqlRepository(connection)
+    wallets_sql_repository.set_balance("random", 1000)
+    transactions_sql_repository = TransactionSqlRepository(connection)
+    assert not transactions_sql_repository.transfer(1, 2, 990, 15, 0)
+    assert wallets_sql_repository.get_wallet_balance("random") == 1000
+    assert wallets_sql_repository.get_wallet_balance("random1") == 0
+    assert transactions_sql_repository.get_statistics() == (0, 0)
+
+
+def test_transfer_to_missing_wallet_rolled_back(connection: Connection) -> None:
+    wallets_sql_repository = WalletsSqlRepository(connection)
+    wallets_sql_repository.set_balance("random", 1000)
+    transactions_sql_repository = TransactionSqlRepository(connection)
+    assert not transactions_sql_repository.transfer(1, 3, 900, 15, 0)
+    assert wallets_sql_repository.get_wallet_balance("random") == 1000
+    assert transactions_sql_repository.get_statistics() == (0, 0)
+
+
+def test_concurrent_transfers_keep_balances(connection: Connection) -> None:
+    wallets_sql_repository = WalletsSqlRepository(connection)
+    wallets_sql_repository.set_balance("random", 150)
+    wallets_sql_repository.set_balance("random1", 150)
+    transactions_sql_repository = TransactionSqlRepository(connection)
+
+    def transfer(thread: int) -> None:
+        for i in range(50):
+            from_id, to_id = (1, 2) if (thread + i) % 2 else (2, 1)
+            # most of these overdraw and must leave no trace
+            to_id = 3 if i % 7 == 0 else to_id
+            transactions_sql_repository.transfer(from_id, to_id, 40 + i, 1, 0)
+
+    threads = [Thread(target=transfer, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _, profit = transactions_sql_repository.get_statistics()
+    balances = wallets_sql_repository.get_wallet_balance(
+        "random"
+    ) + wallets_sql_repository.get_wallet_balance("random1")
+    assert balances + profit == 300
+
+
+def test_iter_transactions_in_batches(connection: Connection) -> None:
+    transactions_sql_repository = TransactionSqlRepository(connection)
+    for amount in range(1, 6):
+        assert transactions_sql_repository.create_transaction(1, 2, amount, 0, 0)
+    assert transactions_sql_repository.create_transaction(2, 1, 6, 0, 0)
+
+    transactions = transactions_sql_repository.iter_transactions([1], 2)
+    assert [t.amount_in_satoshi for t in transactions] == [1, 2, 3, 4, 5, 6]
+    assert list(transactions_sql_repository.iter_transactions([], 2)) == []
+
+
+def test_rebuild_statistics(connection: Connection) -> None:
+    transactions_sql_repository = TransactionSqlRepository(connection)
+    assert transactions_sql_repository.create_transaction(1, 2, 1000, 15, 0)
+    assert transactions_sql_repository.create_transaction(2, 1, 500, 8, 0)
+    with connection:
+        connection.execute("UPDATE statistics SET transaction_count = 0")
+    assert transactions_sql_repository.rebuild_statistics() == (2, 23)
+    assert transactions_sql_repository.get_statistics() == (2, 23)
+
+
+def test_statistics_rollups(connection: Connection) -> None:
+    transactions_sql_repository = TransactionSqlRepository(connection)
+    assert transactions_sql_repository.create_transaction(1, 2, 1000, 15, 60)
+    assert transactions_sql_repository.create_transaction(1, 2, 500, 8, 3599.5)
+    assert transactions_sql_repository.create_transaction(2, 1, 200, 3, 3600)
+    assert transactions_sql_repository.get_statistics_rollups(
+        StatisticsBucket.HOUR, 0, 7200
+    ) == [(0, 2, 1500, 23), (3600, 1, 200, 3)]
+    assert transactions_sql_repository.get_statistics_rollups(
+        StatisticsBucket.DAY, 0, 86400
+    ) == [(0, 3, 1700, 26)]
+
+    with connection:
+        connection.execute("DELETE FROM statistics_rollups")
+    transactions_sql_repository.rebuild_statistics()
+    assert transactions_sql_repository.get_statistics_rollups(
+        StatisticsBucket.HOUR, 0, 7200
+    ) == [(0, 2, 1500, 23), (3600, 1, 200, 3)]
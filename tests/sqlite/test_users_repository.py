@@ -2,12 +2,17 @@ import sqlite3
 
 import pytest
 
+from app.core.interactors.users import Principal
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.users import UsersSqlRepository
+from app.infra.sqlite.wallets import WalletsSqlRepository
 
 
 @pytest.fixture
 def repository() -> UsersSqlRepository:
-    return UsersSqlRepository(sqlite3.connect(":memory:", check_same_thread=False))
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
+    return UsersSqlRepository(connection)
 
 
 def test_create_user(repository: UsersSqlRepository) -> None:
@@ -24,3 +29,18 @@ def test_user_exists_with_email(repository: UsersSqlRepository) -> None:
     repository.create_user("test", "test_key")
     assert repository.user_exists_with_email("test")
     assert not repository.user_exists_with_email("test1")
+
+
+def test_get_principal(repository: UsersSqlRepository) -> None:
+    wallets = WalletsSqlRepository(repository.connection)
+    repository.create_user("test", "test_key")
+    repository.create_user("other", "other_key")
+    assert repository.get_principal("test_key") == Principal(1)
+
+    wallets.create_wallet(1, "address_1", 100)
+    wallets.create_wallet(2, "address_2", 100)
+    wallets.create_wallet(1, "address_3", 100)
+    assert repository.get_principal("test_key") == Principal(
+        1, {"address_1": 1, "address_3": 3}
+    )
+    assert repository.get_principal("missing_key") is None
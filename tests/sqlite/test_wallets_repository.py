@@ -1,8 +1,11 @@
 import sqlite3
 from sqlite3 import Connection
+from threading import Thread
 
 import pytest
 
+from app.core.interactors.wallets import WalletCreation, WalletRef
+from app.infra.sqlite.migrations import migrate
 from app.infra.sqlite.users import UsersSqlRepository
 from app.infra.sqlite.wallets import WalletsSqlRepository
 
@@ -10,6 +13,7 @@ from app.infra.sqlite.wallets import WalletsSqlRepository
 @pytest.fixture
 def connection() -> Connection:
     connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrate(connection)
     users_sql_repository = UsersSqlRepository(connection)
     users_sql_repository.create_user("test", "test_key")
     return connection
@@ -31,3 +35,55 @@ def test_get_balance(connection: Connection) -> None:
     wallet_sql_repository = WalletsSqlRepository(connection)
     wallet_sql_repository.create_wallet(1, "random_addr", 1)
     assert wallet_sql_repository.get_wallet_balance(address="random_addr") == 1
+
+
+def test_create_wallet_within_limit(connection: Connection) -> None:
+    wallet_sql_repository = WalletsSqlRepository(connection)
+    assert wallet_sql_repository.create_wallet_within_limit(
+        1, "addr_1", 0, 2
+    ) == WalletCreation(WalletRef(1, 1))
+    assert wallet_sql_repository.create_wallet_within_limit(
+        1, "addr_1", 0, 2
+    ) == WalletCreation(None)
+    assert wallet_sql_repository.create_wallet_within_limit(
+        1, "addr_2", 0, 2
+    ) == WalletCreation(WalletRef(2, 1))
+    assert wallet_sql_repository.create_wallet_within_limit(
+        1, "addr_3", 0, 2
+    ) == WalletCreation(None, limit_reached=True)
+    assert wallet_sql_repository.get_user_wallets(1) == [1, 2]
+
+
+def test_parallel_creates_respect_limit(connection: Connection) -> None:
+    wallet_sql_repository = WalletsSqlRepository(connection)
+
+    def create(thread: int) -> None:
+        for i in range(10):
+            # every thread also races the others for the same addresses
+            wallet_sql_repository.create_wallet_within_limit(1, f"addr_{i}", 0, 3)
+            wallet_sql_repository.create_wallet_within_limit(
+                1, f"addr_{thread}_{i}", 0, 3
+            )
+
+    threads = [Thread(target=create, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(wallet_sql_repository.get_user_wallets(1)) == 3
+
+
+def test_get_user_wallet_balances(connection: Connection) -> None:
+    wallet_sql_repository = WalletsSqlRepository(connection)
+    wallet_sql_repository.create_wallet(1, "addr_1", 10)
+    wallet_sql_repository.create_wallet(2, "addr_2", 20)
+    wallet_sql_repository.create_wallet(1, "addr_3", 30)
+    assert wallet_sql_repository.get_user_wallet_balances(1) == [
+        ("addr_1", 10),
+        ("addr_3", 30),
+    ]
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT address, balance FROM wallets WHERE user_id = ?",
+        (1,),
+    ).fetchall()
+    assert "wallets_user_id" in plan[0][3]